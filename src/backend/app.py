@@ -2,137 +2,334 @@
 Flask application for trading chart system
 """
 
-from flask import Flask, jsonify, request, send_from_directory, Response
+# Must run before anything else imports socket/threading/time
+from gevent import monkey
+monkey.patch_all()
+
+from gevent import get_hub
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from gevent.threadpool import ThreadPoolExecutor
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
-import sys
+from flask_compress import Compress
 from pathlib import Path
 import logging
-import threading
+import hashlib
+import mimetypes
 import time
+import zlib
+from dataclasses import dataclass, asdict, replace
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+import orjson
 
-sys.path.append(str(Path(__file__).parent.parent))
-
-from data_processor import DataProcessor
-from fvg_detector_v4 import FVGDetectorV4
-from time_utils import TimeZoneConverter
-from us_holidays import USMarketHolidays
-from candle_continuity_checker import CandleContinuityChecker
-from replay_server import ReplayServer
-from utils.config import FLASK_CONFIG, TIMEFRAMES
+from .data_processor import DataProcessor
+from .fvg_detector_v4 import FVGDetectorV4, FVGResult
+from .time_utils import TimeZoneConverter
+from .us_holidays import HOLIDAYS
+from .candle_continuity_checker import CandleContinuityChecker
+from .replay_server import ReplayServer
+from utils.config import FLASK_CONFIG, COMPRESS_CONFIG, TIMEFRAMES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='../frontend')
 CORS(app)
+app.config.update(COMPRESS_CONFIG)
+Compress(app)
+
+STATIC_CACHE_SECONDS = 3600
+
+def _load_static_files(static_folder):
+    """Read frontend files once into memory: {filename: (body, etag, mimetype)}"""
+    cache = {}
+    for file_path in Path(static_folder).rglob('*'):
+        if file_path.suffix not in ('.css', '.js', '.html'):
+            continue
+        body = file_path.read_bytes()
+        mimetype = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+        cache[file_path.relative_to(static_folder).as_posix()] = (body, hashlib.sha1(body).hexdigest(), mimetype)
+    return cache
+
+# Frontend files are small and never change while the server runs - serve from memory
+STATIC_CACHE = _load_static_files(app.static_folder)
+
+def _etag_matches(etag):
+    """If-None-Match check that also accepts the ':gzip' / ':br' suffix Flask-Compress adds to ETags"""
+    client_etags = request.if_none_match.as_set(include_weak=True)
+    return any(tag.split(':')[0] == etag for tag in client_etags)
+
+def serve_static(filename, max_age=STATIC_CACHE_SECONDS):
+    """Serve a cached frontend file with ETag / 304 handling"""
+    cached = STATIC_CACHE.get(filename)
+    if cached is None:
+        return "Not Found", 404
+        
+    body, etag, mimetype = cached
+    if _etag_matches(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
 
 data_processor = DataProcessor()
 fvg_detector = FVGDetectorV4()
 tz_converter = TimeZoneConverter()
-holiday_checker = USMarketHolidays()
+holiday_checker = HOLIDAYS
 continuity_checker = CandleContinuityChecker()
 replay_server = ReplayServer(data_processor)
 
-is_loading = False
-loading_progress = {
-    'percentage': 0,
-    'message': 'Initializing...',
-    'current_file': '',
-    'completed_files': 0,
-    'total_files': 6
-}
+@dataclass(frozen=True)
+class LoadingProgress:
+    """Immutable loading snapshot - the loader thread swaps in a new one, readers never see a torn update"""
+    is_loading: bool = False
+    percentage: int = 0
+    message: str = 'Initializing...'
+    current_file: str = ''
+    completed_files: int = 0
+    total_files: int = 6
+
+_progress = LoadingProgress()
+
+# Prebuilt bodies for the polled status endpoints, rebuilt whenever state changes
+_status_body = b'{}'
+_timeframes_body = b'{}'
+_health_prefix = b'{}'
+
+def _refresh_status_bodies():
+    """Re-serialize loading status, timeframes and health from current state"""
+    global _status_body, _timeframes_body, _health_prefix
+    progress = _progress  # Read the snapshot once
+    data_loaded = len(data_processor.loaded_data) > 0
+    
+    # Get base status from data processor
+    status = dict(data_processor.get_loading_status())
+    
+    # Add our enhanced progress information
+    status.update(asdict(progress))
+    status['server_ready'] = not progress.is_loading and data_loaded
+    status['data_loaded'] = data_loaded
+    
+    _status_body = orjson.dumps(status)
+    _timeframes_body = orjson.dumps({
+        'timeframes': TIMEFRAMES,
+        'loaded': list(data_processor.loaded_data.keys())
+    })
+    # Timestamp is appended per request
+    _health_prefix = orjson.dumps({'status': 'healthy', 'data_loaded': data_loaded})[:-1] + b',"timestamp":'
+
+def _set_progress(**changes):
+    """Swap in a new progress snapshot and refresh the prebuilt status bodies"""
+    global _progress
+    _progress = replace(_progress, **changes)
+    _refresh_status_bodies()
+
+_refresh_status_bodies()
+
+# {(date_ord, timeframe): orjson.Fragment} - FVGs serialized once after data load
+_fvg_json_cache = {}
+
+# {timeframe: scan_timeframe output} - one FVG scan per loaded frame, per-date windows are cut from it
+_fvg_scans = {}
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+def fast_json(obj, status=200):
+    """Serialize response with orjson - handles numpy scalars/arrays natively"""
+    return Response(
+        orjson.dumps(
+            obj,
+            default=data_processor._convert_to_json_serializable,
+            option=ORJSON_OPTIONS
+        ),
+        status=status,
+        mimetype='application/json'
+    )
+
+CHART_CACHE_SECONDS = 30
+
+def _chart_etag(date_key, timeframe):
+    """Validator for a chart payload - the body only changes when the CSVs behind it do"""
+    return f"{data_processor.data_version}-{data_processor.date_to_ordinal(date_key)}-{timeframe}"
+
+def _with_chart_validators(response, etag, max_age=CHART_CACHE_SECONDS):
+    """Attach ETag and private Cache-Control to a chart response (max_age=0 forces revalidation)"""
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@lru_cache(maxsize=512)
+def _cached_date_slice(date_key, timeframe):
+    """Candle slice for (date, timeframe), shared between requests until data reloads"""
+    return data_processor.get_data_for_date(date_key, timeframe)
+
+@lru_cache(maxsize=512)
+def _cached_chart_json(date_key, timeframe):
+    """Pre-serialized candle list for (date, timeframe) - the per-candle dicts only live while it is encoded"""
+    chart_data = data_processor.prepare_chart_data(_cached_date_slice(date_key, timeframe))
+    return orjson.Fragment(orjson.dumps(chart_data, option=ORJSON_OPTIONS))
+
+@lru_cache(maxsize=512)
+def _cached_fvgs(date_key, timeframe):
+    """Columnar FVGResult for (date, timeframe)"""
+    scan = _fvg_scans.get(timeframe)
+    if scan is not None:
+        row_range = data_processor.get_range_for_date(date_key, timeframe)
+        if row_range is None:
+            return FVGResult.empty()
+        return fvg_detector.fvgs_in_range(data_processor.loaded_data[timeframe], scan, *row_range)
+        
+    df = _cached_date_slice(date_key, timeframe)
+    if df is None or df.empty or 'timestamp' not in df.columns:
+        return FVGResult.empty()
+    return fvg_detector.detect_fvgs_columnar(df)
+
+def _fvg_json(date_key, timeframe):
+    """Pre-serialized FVG list for (date, timeframe), embedded as-is by orjson"""
+    fragment = _fvg_json_cache.get((data_processor.date_to_ordinal(date_key), timeframe))
+    if fragment is None:
+        fragment = orjson.Fragment(orjson.dumps(_cached_fvgs(date_key, timeframe).to_dicts(), option=ORJSON_OPTIONS))
+    return fragment
+
+def precompute_fvgs():
+    """Detect and serialize FVGs for every common date in every timeframe, off the request path"""
+    global _fvg_json_cache, _fvg_scans
+    start_time = time.time()
+    cache = {}
+    scans = {}
+    
+    for timeframe in TIMEFRAMES:
+        if timeframe not in data_processor.loaded_data:
+            continue
+            
+        # Scan the whole frame once; every date's window is a slice of the same result
+        df = data_processor.loaded_data[timeframe]
+        scan = scans[timeframe] = fvg_detector.scan_timeframe(df)
+        
+        for date_key in data_processor.common_dates:
+            row_range = data_processor.get_range_for_date(date_key, timeframe)
+            if row_range is None:
+                continue
+                
+            fvgs = fvg_detector.fvgs_in_range(df, scan, *row_range).to_dicts()
+            cache[(data_processor.date_to_ordinal(date_key), timeframe)] = orjson.Fragment(orjson.dumps(fvgs, option=ORJSON_OPTIONS))
+    
+    _fvg_scans = scans
+    _fvg_json_cache = cache
+    logger.info(f"Precomputed FVGs for {len(cache)} (date, timeframe) pairs in {time.time() - start_time:.2f}s")
+
+@lru_cache(maxsize=512)
+def _cached_market_hours(date):
+    """Market hours in Taipei time for given date"""
+    return tz_converter.get_market_hours_taipei(date)
+
+@lru_cache(maxsize=512)
+def _cached_holiday(date):
+    """Holiday info for given date, serialized once as its JSON object"""
+    return orjson.Fragment(orjson.dumps(holiday_checker.get_holiday_info(date)._asdict()))
+
+def clear_response_caches():
+    """Drop all per-date caches - call whenever loaded data changes"""
+    global _fvg_json_cache, _fvg_scans
+    _fvg_json_cache = {}
+    _fvg_scans = {}
+    _cached_date_slice.cache_clear()
+    _cached_chart_json.cache_clear()
+    _cached_fvgs.cache_clear()
+    _cached_market_hours.cache_clear()
+    _cached_holiday.cache_clear()
 
 def load_data_async():
     """Load data in background thread"""
-    global is_loading, loading_progress
-    is_loading = True
-    loading_progress['message'] = 'Starting data load...'
-    loading_progress['percentage'] = 0
+    _set_progress(is_loading=True, percentage=0, message='Starting data load...')
     
     try:
         # Override data processor progress callback
         def progress_callback(file_name, completed, total):
-            loading_progress['current_file'] = file_name
-            loading_progress['completed_files'] = completed
-            loading_progress['total_files'] = total
-            loading_progress['percentage'] = int((completed / total) * 100)
-            loading_progress['message'] = f'Loading {file_name}... ({completed}/{total})'
-            logger.info(f"Progress: {loading_progress['percentage']}% - {loading_progress['message']}")
+            _set_progress(
+                current_file=file_name,
+                completed_files=completed,
+                total_files=total,
+                percentage=int((completed / total) * 100),
+                message=f'Loading {file_name}... ({completed}/{total})'
+            )
+            logger.info(f"Progress: {_progress.percentage}% - {_progress.message}")
         
         data_processor.load_all_data(progress_callback)
-        loading_progress['percentage'] = 100
-        loading_progress['message'] = 'Data loading completed!'
+        clear_response_caches()
+        tz_converter.precompute_market_hours(
+            data_processor.ordinal_to_date(date_ord) for date_ord in data_processor.date_index.get('M1', {})
+        )
+        _set_progress(percentage=100, message='Data loading completed!')
         logger.info("All data loaded successfully")
     except Exception as e:
         logger.error(f"Error loading data: {str(e)}")
-        loading_progress['percentage'] = 100
-        loading_progress['message'] = f'Warning: {str(e)} - System running without data'
-        loading_progress['message'] = f'Error: {str(e)}'
+        _set_progress(percentage=100, message=f'Error: {str(e)}')
     finally:
-        is_loading = False
+        _set_progress(is_loading=False)
+    
+    # Server is already usable here - requests fall back to lazy detection until this finishes
+    try:
+        precompute_fvgs()
+    except Exception as e:
+        logger.error(f"Error precomputing FVGs: {str(e)}")
+
+def start_data_loading():
+    """Start the background data load - called once per server process"""
+    # CSV parsing is CPU-bound - run it on a real OS thread so the gevent hub
+    # keeps serving the status page while data loads
+    get_hub().threadpool.spawn(load_data_async)
 
 @app.route('/')
 def index():
     """Serve full professional version or status page if loading"""
-    if is_loading or len(data_processor.loaded_data) == 0:
-        return send_from_directory(app.static_folder, 'server-status.html')
-    return send_from_directory(app.static_folder, 'index.html')
+    # Content depends on load state - always revalidate
+    if _progress.is_loading or len(data_processor.loaded_data) == 0:
+        return serve_static('server-status.html', max_age=0)
+    return serve_static('index.html', max_age=0)
 
 @app.route('/status')
 def status_page():
     """Serve server status page"""
-    return send_from_directory(app.static_folder, 'server-status.html')
+    return serve_static('server-status.html')
 
 @app.route('/simple')
 def simple():
     """Serve simple HTML interface"""
-    return send_from_directory(app.static_folder, 'index-simple.html')
+    return serve_static('index-simple.html')
 
 @app.route('/full')
 def full():
     """Serve full professional version"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_static('index.html')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """System health check"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': time.time(),
-        'data_loaded': len(data_processor.loaded_data) > 0
-    })
+    return Response(_health_prefix + repr(time.time()).encode() + b'}', mimetype='application/json')
 
 @app.route('/api/loading-status', methods=['GET'])
 def loading_status():
     """Get current loading status"""
-    global loading_progress, is_loading
-    
-    # Get base status from data processor
-    status = data_processor.get_loading_status() if hasattr(data_processor, 'get_loading_status') else {}
-    
-    # Add our enhanced progress information
-    status.update({
-        'is_loading': is_loading,
-        'percentage': loading_progress['percentage'],
-        'message': loading_progress['message'],
-        'current_file': loading_progress['current_file'],
-        'completed_files': loading_progress['completed_files'],
-        'total_files': loading_progress['total_files'],
-        'server_ready': not is_loading and len(data_processor.loaded_data) > 0,
-        'data_loaded': len(data_processor.loaded_data) > 0
-    })
-    
-    return jsonify(status)
+    return Response(_status_body, mimetype='application/json')
 
 @app.route('/api/timeframes', methods=['GET'])
 def get_timeframes():
     """Get available timeframes"""
-    return jsonify({
-        'timeframes': TIMEFRAMES,
-        'loaded': list(data_processor.loaded_data.keys())
-    })
+    return Response(_timeframes_body, mimetype='application/json')
 
 @app.route('/api/random-data', methods=['GET'])
 def get_random_data():
@@ -142,32 +339,38 @@ def get_random_data():
     if not data_processor.loaded_data:
         return jsonify({'error': 'Data not loaded yet'}), 503
     
-    df = data_processor.get_random_date_data(timeframe)
+    random_date = data_processor.get_random_date(timeframe)
+    df = _cached_date_slice(random_date, timeframe) if random_date is not None else None
     
     if df is None or df.empty:
         return jsonify({'error': 'No data available'}), 404
     
-    chart_data = data_processor.prepare_chart_data(df)
+    # Same URL returns a different date each time - let the browser revalidate, never reuse blindly
+    etag = _chart_etag(random_date, timeframe)
+    if _etag_matches(etag):
+        return _with_chart_validators(Response(status=304), etag, max_age=0)
+    
+    chart_data = _cached_chart_json(random_date, timeframe)
     
-    fvgs = fvg_detector.detect_fvgs_vectorized(df)
+    fvgs = _fvg_json(random_date, timeframe)
     
     date = df.iloc[0]['Date']
-    market_hours = tz_converter.get_market_hours_taipei(date)
-    holiday_info = holiday_checker.get_holiday_info(date)
+    market_hours = _cached_market_hours(date)
+    holiday_info = _cached_holiday(date)
     
     response = {
         'date': date,
         'timeframe': timeframe,
         'data': chart_data,
         'fvgs': fvgs,
-        'candle_count': len(chart_data),
+        'candle_count': len(df),
         'ny_open_taipei': market_hours['open'],
         'ny_close_taipei': market_hours['close'],
         'is_dst': market_hours['is_dst'],
         'holiday_info': holiday_info
     }
     
-    return jsonify(data_processor._convert_to_json_serializable(response))
+    return _with_chart_validators(fast_json(response), etag, max_age=0)
 
 @app.route('/api/common-random-date', methods=['GET'])
 def get_common_random_date():
@@ -211,23 +414,29 @@ def get_common_random_data():
             common_date = date
             
         # Get data for this date in the requested timeframe
-        df = data_processor.get_data_for_date(common_date, timeframe)
+        df = _cached_date_slice(common_date, timeframe)
         
         if df is None or df.empty:
             return jsonify({'error': f'No data available for {common_date} in {timeframe}'}), 404
         
-        chart_data = data_processor.prepare_chart_data(df)
-        fvgs = fvg_detector.detect_fvgs_vectorized(df)
+        # Only an explicit ?date= is stable enough to be reused without asking
+        max_age = CHART_CACHE_SECONDS if date else 0
+        etag = _chart_etag(common_date, timeframe)
+        if _etag_matches(etag):
+            return _with_chart_validators(Response(status=304), etag, max_age)
         
-        market_hours = tz_converter.get_market_hours_taipei(common_date)
-        holiday_info = holiday_checker.get_holiday_info(common_date)
+        chart_data = _cached_chart_json(common_date, timeframe)
+        fvgs = _fvg_json(common_date, timeframe)
+        
+        market_hours = _cached_market_hours(common_date)
+        holiday_info = _cached_holiday(common_date)
         
         response = {
             'date': common_date,
             'timeframe': timeframe,
             'data': chart_data,
             'fvgs': fvgs,
-            'candle_count': len(chart_data),
+            'candle_count': len(df),
             'ny_open_taipei': market_hours['open'],
             'ny_close_taipei': market_hours['close'],
             'is_dst': market_hours['is_dst'],
@@ -235,7 +444,7 @@ def get_common_random_data():
             'is_common_date': True
         }
         
-        return jsonify(data_processor._convert_to_json_serializable(response))
+        return _with_chart_validators(fast_json(response), etag, max_age)
         
     except Exception as e:
         logger.error(f"Error getting common random data: {str(e)}")
@@ -251,24 +460,16 @@ def get_m1_random_date():
         # Use the common random date logic to ensure consistency across timeframes
         common_date = data_processor.get_common_random_date()
         
-        df = data_processor.loaded_data['M1']
-        
         if not common_date:
             # Fallback to M1-only dates if no common dates found
             logger.warning("No common dates found, falling back to M1-only random date")
-            df['date'] = pd.to_datetime(df['timestamp'], unit='s').dt.date
-            unique_dates = df['date'].unique()
-            random_date = np.random.choice(unique_dates)
-            date_str = random_date.strftime('%Y-%m-%d')
-            selected_date = random_date
+            random_ord = np.random.choice(list(data_processor.date_index['M1'].keys()))
+            date_str = data_processor.ordinal_to_date_str(random_ord)
         else:
             date_str = common_date
-            # Convert string back to date for filtering
-            selected_date = pd.to_datetime(common_date).date()
         
         # Get basic info about this date
-        df['date'] = pd.to_datetime(df['timestamp'], unit='s').dt.date
-        date_data = df[df['date'] == selected_date]
+        date_data = data_processor.get_rows_for_date(date_str, 'M1')
         candle_count = len(date_data)
         
         # Get min/max timestamps for this date
@@ -295,17 +496,14 @@ def get_m1_date_range():
             return jsonify({'error': 'M1 data not loaded'}), 400
             
         df = data_processor.loaded_data['M1']
+        date_index = data_processor.date_index['M1']
         
-        # Get min and max dates
-        min_timestamp = df['timestamp'].min()
-        max_timestamp = df['timestamp'].max()
-        
-        min_date = pd.to_datetime(min_timestamp, unit='s').date()
-        max_date = pd.to_datetime(max_timestamp, unit='s').date()
+        # Get min and max dates straight from the day-number index
+        min_date = data_processor.ordinal_to_date(min(date_index))
+        max_date = data_processor.ordinal_to_date(max(date_index))
         
         # Count unique dates
-        df['date'] = pd.to_datetime(df['timestamp'], unit='s').dt.date
-        unique_dates = df['date'].nunique()
+        unique_dates = len(date_index)
         total_candles = len(df)
         
         return jsonify({
@@ -326,17 +524,21 @@ def get_data_by_date(date, timeframe):
     if not data_processor.loaded_data:
         return jsonify({'error': 'Data not loaded yet'}), 503
     
-    df = data_processor.get_data_for_date(date, timeframe)
+    df = _cached_date_slice(date, timeframe)
     
     if df is None or df.empty:
         return jsonify({'error': 'No data available for this date'}), 404
     
-    chart_data = data_processor.prepare_chart_data(df)
+    etag = _chart_etag(date, timeframe)
+    if _etag_matches(etag):
+        return _with_chart_validators(Response(status=304), etag)
+    
+    chart_data = _cached_chart_json(date, timeframe)
     
-    fvgs = fvg_detector.detect_fvgs_vectorized(df)
+    fvgs = _fvg_json(date, timeframe)
     
-    market_hours = tz_converter.get_market_hours_taipei(date)
-    holiday_info = holiday_checker.get_holiday_info(date)
+    market_hours = _cached_market_hours(date)
+    holiday_info = _cached_holiday(date)
     
     continuity = continuity_checker.check_continuity(df, timeframe)
     
@@ -345,7 +547,7 @@ def get_data_by_date(date, timeframe):
         'timeframe': timeframe,
         'data': chart_data,
         'fvgs': fvgs,
-        'candle_count': len(chart_data),
+        'candle_count': len(df),
         'ny_open_taipei': market_hours['open'],
         'ny_close_taipei': market_hours['close'],
         'is_dst': market_hours['is_dst'],
@@ -353,40 +555,46 @@ def get_data_by_date(date, timeframe):
         'continuity': continuity
     }
     
-    return jsonify(data_processor._convert_to_json_serializable(response))
+    return _with_chart_validators(fast_json(response), etag)
+
+def _analyze_timeframe_fvgs(timeframe):
+    """FVG debug summary for a random date in one timeframe"""
+    try:
+        random_date = data_processor.get_random_date(timeframe)
+        df = _cached_date_slice(random_date, timeframe) if random_date is not None else None
+        if df is None or df.empty:
+            return timeframe, {'error': 'No data available'}
+            
+        # Check if timestamp column exists
+        has_timestamp = 'timestamp' in df.columns
+        fvgs = _cached_fvgs(random_date, timeframe)
+        
+        sample_candles = []
+        if len(df) >= 3:
+            sample_df = df.head(3)[['DateTime', 'Open', 'High', 'Low', 'Close']]
+            sample_candles = sample_df.astype(str).to_dict('records')
+        
+        return timeframe, {
+            'data_rows': len(df),
+            'has_timestamp': has_timestamp,
+            'columns': list(df.columns),
+            'fvg_count': len(fvgs),
+            'sample_candles': sample_candles,
+            'first_fvg': fvgs[0] if fvgs else None
+        }
+    except Exception as e:
+        return timeframe, {'error': str(e)}
 
 @app.route('/api/debug/fvg-analysis', methods=['GET'])
 def debug_fvg_analysis():
     """Debug endpoint to analyze FVG detection across timeframes"""
-    results = {}
+    timeframes = ['M1', 'M5', 'M15', 'H1', 'H4', 'D1']
     
-    for timeframe in ['M1', 'M5', 'M15', 'H1', 'H4', 'D1']:
-        try:
-            df = data_processor.get_random_date_data(timeframe)
-            if df is not None and not df.empty:
-                # Check if timestamp column exists
-                has_timestamp = 'timestamp' in df.columns
-                fvgs = fvg_detector.detect_fvgs_vectorized(df) if has_timestamp else []
-                
-                sample_candles = []
-                if len(df) >= 3:
-                    sample_df = df.head(3)[['DateTime', 'Open', 'High', 'Low', 'Close']]
-                    sample_candles = sample_df.astype(str).to_dict('records')
-                
-                results[timeframe] = {
-                    'data_rows': len(df),
-                    'has_timestamp': has_timestamp,
-                    'columns': list(df.columns),
-                    'fvg_count': len(fvgs),
-                    'sample_candles': sample_candles,
-                    'first_fvg': data_processor._convert_to_json_serializable(fvgs[0]) if fvgs else None
-                }
-            else:
-                results[timeframe] = {'error': 'No data available'}
-        except Exception as e:
-            results[timeframe] = {'error': str(e)}
+    # gevent's executor runs on real OS threads (the stdlib one would be greenlets after monkey-patching)
+    with ThreadPoolExecutor(max_workers=len(timeframes)) as executor:
+        results = dict(executor.map(_analyze_timeframe_fvgs, timeframes))
     
-    return jsonify(results)
+    return fast_json(results)
 
 # ============= REPLAY API ENDPOINTS =============
 
@@ -484,19 +692,40 @@ def seek_replay():
         logger.error(f"Error seeking replay: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _gzip_event_stream(chunks):
+    """
+    gzip an SSE stream chunk by chunk - Z_SYNC_FLUSH after every chunk pushes each event to the
+    client right away instead of letting the compressor hold it back for a fuller block
+    """
+    compressor = zlib.compressobj(COMPRESS_CONFIG['COMPRESS_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
 @app.route('/api/replay/stream')
 def replay_stream():
     """Server-Sent Events stream for real-time candle data"""
     try:
         def add_cors_headers():
+            stream = replay_server.candle_stream_generator(legacy=request.args.get('legacy') == '1')
+            # Flask-Compress would buffer the whole stream, so compress here with per-chunk flushes
+            gzip_stream = request.accept_encodings['gzip'] > 0
             response = Response(
-                replay_server.candle_stream_generator(),
-                mimetype='text/event-stream'
+                _gzip_event_stream(stream) if gzip_stream else stream,
+                mimetype='text/event-stream',
+                direct_passthrough=True
             )
+            if gzip_stream:
+                response.headers['Content-Encoding'] = 'gzip'
             response.headers.add('Access-Control-Allow-Origin', '*')
             response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
             response.headers.add('Cache-Control', 'no-cache')
             response.headers.add('Connection', 'keep-alive')
+            # Tell nginx not to buffer the stream even where proxy_buffering is on
+            response.headers.add('X-Accel-Buffering', 'no')
             return response
             
         return add_cors_headers()
@@ -508,20 +737,19 @@ def replay_stream():
 @app.route('/<path:filename>')
 def serve_static_files(filename):
     """Serve static CSS and JS files"""
-    if filename.endswith(('.css', '.js', '.html')):
-        return send_from_directory(app.static_folder, filename)
-    return "Not Found", 404
+    return serve_static(filename)
 
 if __name__ == '__main__':
     logger.info("Starting Flask application...")
     logger.info(f"Loading data from {data_processor.data_dir}")
     
-    load_thread = threading.Thread(target=load_data_async)
-    load_thread.start()
+    start_data_loading()
     
-    app.run(
-        host=FLASK_CONFIG['HOST'],
-        port=FLASK_CONFIG['PORT'],
-        debug=FLASK_CONFIG['DEBUG'],
-        threaded=FLASK_CONFIG['THREADED']
-    )
\ No newline at end of file
+    # SSE replay streams are greenlets instead of one worker thread per client;
+    # the bounded pool queues connections beyond MAX_CONNECTIONS
+    http_server = WSGIServer(
+        (FLASK_CONFIG['HOST'], FLASK_CONFIG['PORT']),
+        app,
+        spawn=Pool(FLASK_CONFIG['MAX_CONNECTIONS'])
+    )
+    http_server.serve_forever()
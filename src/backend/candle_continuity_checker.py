@@ -5,20 +5,52 @@ Candle continuity checker with performance optimization
 import pandas as pd
 import numpy as np
 import logging
-from datetime import timedelta
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Without numba the OHLC check falls back to one NumPy comparison per rule
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
+@njit(cache=True, nogil=True)
+def _ohlc_consistent_kernel(open_prices, high_prices, low_prices, close_prices):
+    """Single pass over the bars, stopping at the first candle whose High/Low don't bound Open and Close"""
+    for i in range(len(open_prices)):
+        if (high_prices[i] < open_prices[i] or high_prices[i] < close_prices[i] or
+                low_prices[i] > open_prices[i] or low_prices[i] > close_prices[i]):
+            return False
+    return True
+
+def _ohlc_consistent_numpy(open_prices, high_prices, low_prices, close_prices):
+    """NumPy equivalent of _ohlc_consistent_kernel - rules are checked one at a time, stopping at the first failure"""
+    return not (
+        (high_prices < open_prices).any() or (high_prices < close_prices).any() or
+        (low_prices > open_prices).any() or (low_prices > close_prices).any()
+    )
+
+_ohlc_consistent = _ohlc_consistent_kernel if NUMBA_AVAILABLE else _ohlc_consistent_numpy
+
 class CandleContinuityChecker:
-    def __init__(self):
-        self.timeframe_minutes = {
-            'M1': 1,
-            'M5': 5,
-            'M15': 15,
-            'H1': 60,
-            'H4': 240,
-            'D1': 1440
-        }
+    timeframe_minutes = {
+        'M1': 1,
+        'M5': 5,
+        'M15': 15,
+        'H1': 60,
+        'H4': 240,
+        'D1': 1440
+    }
+    
+    # (bar seconds, gap threshold seconds) per timeframe, resolved once; unknown timeframes are treated as M15
+    _timeframe_seconds = {timeframe: (minutes * 60, minutes * 90) for timeframe, minutes in timeframe_minutes.items()}
+    _default_seconds = _timeframe_seconds['M15']
         
     def check_continuity(self, df, timeframe):
         """
@@ -31,24 +63,25 @@ class CandleContinuityChecker:
                 'total_gaps': 0
             }
             
-        minutes = self.timeframe_minutes.get(timeframe, 15)
-        expected_diff = minutes * 60
+        # A gap is any step longer than 1.5 bars
+        _, gap_threshold = self._timeframe_seconds.get(timeframe, self._default_seconds)
         
         timestamps = df['timestamp'].values
         time_diffs = np.diff(timestamps)
         
-        gap_mask = time_diffs > expected_diff * 1.5
+        gap_mask = time_diffs > gap_threshold
         gap_indices = np.where(gap_mask)[0]
         
-        gaps = []
-        for idx in gap_indices:
-            gap = {
-                'index': int(idx),
-                'from_time': int(timestamps[idx]),
-                'to_time': int(timestamps[idx + 1]),
-                'gap_minutes': int((timestamps[idx + 1] - timestamps[idx]) / 60)
-            }
-            gaps.append(gap)
+        # All gap fields are gathered as arrays; only the final dict packaging is Python-side
+        gaps = [
+            {'index': idx, 'from_time': from_time, 'to_time': to_time, 'gap_minutes': gap_minutes}
+            for idx, from_time, to_time, gap_minutes in zip(
+                gap_indices.tolist(),
+                timestamps[gap_indices].tolist(),
+                timestamps[gap_indices + 1].tolist(),
+                (time_diffs[gap_indices] // 60).tolist()
+            )
+        ]
         
         return {
             'is_continuous': len(gaps) == 0,
@@ -63,25 +96,14 @@ class CandleContinuityChecker:
         if df.empty or len(df) < 2:
             return df
             
-        minutes = self.timeframe_minutes.get(timeframe, 15)
-        expected_diff = timedelta(minutes=minutes)
-        
-        df = df.copy()
-        df['DateTime'] = pd.to_datetime(df['DateTime'])
-        df = df.set_index('DateTime')
-        
-        freq_map = {
-            'M1': '1T',
-            'M5': '5T',
-            'M15': '15T',
-            'H1': '1H',
-            'H4': '4H',
-            'D1': '1D'
-        }
+        bucket_seconds, _ = self._timeframe_seconds.get(timeframe, self._default_seconds)
         
-        freq = freq_map.get(timeframe, '15T')
+        # Bucket by integer division of the epoch seconds - every timeframe divides a day, so these
+        # are the same bins resample() would use. Only occupied buckets are aggregated; the gaps are
+        # added afterwards by reindexing against the full bucket range.
+        buckets = df['timestamp'].to_numpy() // bucket_seconds
         
-        df_resampled = df.resample(freq).agg({
+        df_grouped = df.groupby(buckets).agg({
             'Open': 'first',
             'High': 'max',
             'Low': 'min',
@@ -90,15 +112,24 @@ class CandleContinuityChecker:
             'timestamp': 'first'
         })
         
-        df_resampled['Close'] = df_resampled['Close'].fillna(method='ffill')
+        all_buckets = np.arange(buckets.min(), buckets.max() + 1)
+        df_resampled = df_grouped.reindex(all_buckets)
+        df_resampled.index = pd.DatetimeIndex((all_buckets * bucket_seconds).astype('datetime64[s]').astype('datetime64[ns]'), name='DateTime')
+        
+        df_resampled['Close'] = df_resampled['Close'].ffill()
         df_resampled['Open'] = df_resampled['Open'].fillna(df_resampled['Close'])
         df_resampled['High'] = df_resampled['High'].fillna(df_resampled['Close'])
         df_resampled['Low'] = df_resampled['Low'].fillna(df_resampled['Close'])
-        df_resampled['Volume'] = df_resampled['Volume'].fillna(0)
+        df_resampled['Volume'] = df_resampled['Volume'].fillna(0).astype(df_grouped['Volume'].dtype)
         
         df_resampled = df_resampled.reset_index()
-        df_resampled['Date'] = df_resampled['DateTime'].dt.strftime('%m/%d/%Y')
-        df_resampled['Time'] = df_resampled['DateTime'].dt.strftime('%H:%M')
+        
+        # Format each distinct day and time of day once, then scatter the strings back by code
+        bar_seconds = all_buckets * bucket_seconds
+        days, day_codes = np.unique(bar_seconds // 86400, return_inverse=True)
+        times_of_day, time_codes = np.unique(bar_seconds % 86400, return_inverse=True)
+        df_resampled['Date'] = pd.to_datetime(days, unit='D').strftime('%m/%d/%Y').to_numpy()[day_codes]
+        df_resampled['Time'] = pd.to_datetime(times_of_day, unit='s').strftime('%H:%M').to_numpy()[time_codes]
         
         return df_resampled
     
@@ -120,10 +151,9 @@ class CandleContinuityChecker:
         if high_low_invalid:
             issues.append("High < Low detected")
         
-        ohlc_invalid = ((df['High'] < df['Open']) | 
-                       (df['High'] < df['Close']) |
-                       (df['Low'] > df['Open']) |
-                       (df['Low'] > df['Close'])).any()
+        ohlc_invalid = not _ohlc_consistent(
+            df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy()
+        )
         if ohlc_invalid:
             issues.append("Invalid OHLC relationships")
         
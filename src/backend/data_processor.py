@@ -5,23 +5,75 @@ Data processor for CSV files with performance optimization
 import pandas as pd
 import numpy as np
 import os
-import sys
-from pathlib import Path
-from datetime import datetime, timedelta
+import io
+from datetime import datetime, date, timedelta
 import logging
 import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import DATA_DIR, LOADING_CONFIG, DEFAULT_CANDLE_COUNT
+try:
+    import fcntl
+except ImportError:
+    # No cross-process lock on Windows - each process may rebuild a stale cache itself
+    fcntl = None
+
+from utils.config import DATA_DIR, CACHE_DIR, LOADING_CONFIG, DEFAULT_CANDLE_COUNT
 from utils.continuity_config import CONTINUITY_CONFIG
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EPOCH_DATE = date(1970, 1, 1)
+
+# Bump when the layout of the cached frames changes, so existing Arrow caches get rebuilt
+CACHE_FORMAT_VERSION = 3
+
+# Minimum candles a date needs in each timeframe to be offered as a random date
+MIN_CANDLES_PER_DATE = {
+    'M1': 20, 'M5': 15, 'M15': 10, 
+    'H1': 5, 'H4': 3, 'D1': 1
+}
+
+# Explicit CSV column types. Date / Time are dictionary-encoded while parsing, so they arrive as
+# pandas categoricals (small int codes) instead of one Python str object per row.
+CSV_COLUMN_TYPES = {
+    'Date': pa.dictionary(pa.int32(), pa.string()),
+    'Time': pa.dictionary(pa.int32(), pa.string()),
+    'Open': pa.float32(),
+    'High': pa.float32(),
+    'Low': pa.float32(),
+    'Close': pa.float32(),
+    'Volume': pa.int32()
+}
+
+def _load_csv_worker(file_path, timeframe, cache_path=None):
+    """
+    Process pool entry point - must be module level to be picklable
+    With cache_path the frame is written there as Arrow IPC instead of being pickled back
+    """
+    processor = DataProcessor()
+    df = processor._load_csv_optimized(file_path, timeframe)
+    if cache_path is None:
+        return df
+        
+    processor._write_shared_frame(df, cache_path, processor._cache_key(file_path))
+    return None
+
 class DataProcessor:
     def __init__(self):
         self.data_dir = DATA_DIR
+        self.cache_dir = CACHE_DIR
         self.loaded_data = {}
+        self.common_dates = None  # Dates valid in all timeframes, built once per load
+        self.date_index = {}  # {timeframe: {date_ord: row slice}}, built once per load
+        self.timestamps = {}  # {timeframe: ascending epoch seconds}, a view of each frame's timestamp column
+        self.valid_dates = {}  # {timeframe: sorted Date strings with at least MIN_CANDLES_PER_DATE candles}
+        self.data_version = None  # Fingerprint of the source CSVs, identical in every server process
         self.loading_progress = {
             'status': 'idle',
             'current_file': '',
@@ -53,119 +105,332 @@ class DataProcessor:
         """Load all CSV files with progress tracking"""
         self.loading_progress['status'] = 'loading'
         self.loading_progress['message'] = 'Starting data load...'
+        self.common_dates = None
         
         csv_files = list(self.data_dir.glob("MNQ_*.csv"))
-        self.loading_progress['total_files'] = len(csv_files)
+        total_files = len(csv_files)
+        self.loading_progress['total_files'] = total_files
+        self.data_version = self._data_version(csv_files)
+        
+        use_cache = LOADING_CONFIG['shared_cache']
+        completed = 0
         
-        for idx, file_path in enumerate(csv_files):
+        def finish_file(file_path, load):
+            nonlocal completed
+            timeframe = file_path.stem.split('_')[1]
             try:
-                timeframe = file_path.stem.split('_')[1]
-                self._update_progress(
-                    current_file=file_path.name,
-                    processed_files=idx,
-                    message=f'Loading {file_path.name}...'
-                )
-                
-                # Call progress callback if provided
-                if progress_callback:
-                    progress_callback(file_path.name, idx + 1, len(csv_files))
-                
-                df = self._load_csv_optimized(file_path, timeframe)
+                df = load()
                 self.loaded_data[timeframe] = df
+                self.date_index[timeframe] = self._build_date_index(df)
+                self.timestamps[timeframe] = df['timestamp'].to_numpy()
+                self.valid_dates[timeframe] = self._count_valid_dates(df, timeframe)
                 
                 logger.info(f"Loaded {timeframe}: {len(df)} rows")
                 
             except Exception as e:
                 logger.error(f"Error loading {file_path}: {str(e)}")
+            
+            completed += 1
+            self._update_progress(
+                current_file=file_path.name,
+                processed_files=completed,
+                message=f'Loaded {file_path.name}'
+            )
+            
+            # Call progress callback if provided
+            if progress_callback:
+                progress_callback(file_path.name, completed, total_files)
+        
+        # Parsed CSVs are kept as Arrow IPC files in cache_dir. Only the first server
+        # process parses a changed CSV; every process then memory-maps the same file,
+        # so numeric columns share one copy in the OS page cache instead of N.
+        with self._shared_cache_lock(use_cache):
+            to_parse = [fp for fp in csv_files if not (use_cache and self._is_cache_fresh(fp))]
+            
+            # Files are independent - parse them concurrently in worker processes.
+            # 'spawn' rather than fork: forking from the gevent-patched server thread is unsafe.
+            max_workers = max(1, min(LOADING_CONFIG['max_workers'], len(to_parse)))
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = {
+                    executor.submit(
+                        _load_csv_worker,
+                        file_path,
+                        file_path.stem.split('_')[1],
+                        self._cache_path(file_path) if use_cache else None
+                    ): file_path
+                    for file_path in to_parse
+                }
+                
+                # Map the up-to-date caches while the workers are still parsing
+                for file_path in csv_files:
+                    if file_path not in to_parse:
+                        finish_file(file_path, lambda: self._read_shared_frame(self._cache_path(file_path)))
                 
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    if use_cache:
+                        finish_file(file_path, lambda: future.result() or self._read_shared_frame(self._cache_path(file_path)))
+                    else:
+                        finish_file(file_path, future.result)
+                
+        self._compute_common_dates()
+        
         self.loading_progress['status'] = 'completed'
-        self.loading_progress['processed_files'] = len(csv_files)
+        self.loading_progress['processed_files'] = total_files
         self.loading_progress['percentage'] = 100
         self.loading_progress['message'] = 'Data loading completed'
         
         # Final callback
         if progress_callback:
-            progress_callback('All files loaded', len(csv_files), len(csv_files))
+            progress_callback('All files loaded', total_files, total_files)
         
         return True
     
+    def _cache_path(self, file_path):
+        """Shared Arrow IPC file for a CSV"""
+        return self.cache_dir / f"{file_path.stem}.arrow"
+    
+    @staticmethod
+    def _cache_key(file_path):
+        """Identifies the CSV contents, truncation settings and frame layout a cached table was built from"""
+        stat = file_path.stat()
+        truncation = CONTINUITY_CONFIG['smart_truncation']
+        return f"v{CACHE_FORMAT_VERSION}:{stat.st_size}:{stat.st_mtime_ns}:{truncation['enabled']}:{truncation['max_rows']}:{truncation['keep_recent']}"
+    
+    @classmethod
+    def _data_version(cls, csv_files):
+        """Short digest over the source CSVs - changes whenever any of them does"""
+        digest = hashlib.blake2b(digest_size=8)
+        for file_path in sorted(csv_files):
+            digest.update(f"{file_path.name}={cls._cache_key(file_path)};".encode())
+        return digest.hexdigest()
+    
+    def _is_cache_fresh(self, file_path):
+        """Check whether the shared cache for a CSV exists and matches its current contents"""
+        cache_path = self._cache_path(file_path)
+        if not cache_path.exists():
+            return False
+            
+        try:
+            metadata = pa.ipc.open_file(pa.memory_map(str(cache_path))).schema.metadata or {}
+        except (pa.ArrowInvalid, OSError):
+            return False
+            
+        return metadata.get(b'source_key') == self._cache_key(file_path).encode()
+    
+    @contextmanager
+    def _shared_cache_lock(self, enabled=True):
+        """Serialize cache rebuilds across server processes"""
+        if not enabled:
+            yield
+            return
+            
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / '.lock', 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield  # Closing the file releases the lock
+    
+    @staticmethod
+    def _write_shared_frame(df, cache_path, source_key):
+        """Write a parsed frame as an uncompressed Arrow IPC file (atomically replaced)"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, b'source_key': source_key.encode()})
+        
+        tmp_path = cache_path.with_suffix('.tmp')
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    
+    @staticmethod
+    def _read_shared_frame(cache_path):
+        """Memory-map a cached table - numeric columns stay zero-copy views of the mapped file"""
+        table = pa.ipc.open_file(pa.memory_map(str(cache_path))).read_all()
+        return table.to_pandas(split_blocks=True)
+    
+    @staticmethod
+    def _read_csv_arrow(source, nrows=None):
+        """Parse a CSV with Arrow's multithreaded block reader; nrows stops streaming once enough rows are read"""
+        read_options = pa_csv.ReadOptions(block_size=1 << 20, use_threads=True)
+        convert_options = pa_csv.ConvertOptions(column_types=CSV_COLUMN_TYPES)
+        
+        if nrows is None:
+            table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+        else:
+            reader = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+            batches = []
+            row_count = 0
+            for batch in reader:
+                batches.append(batch)
+                row_count += batch.num_rows
+                if row_count >= nrows:
+                    break
+            table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+        
+        return table.to_pandas()
+    
+    @staticmethod
+    def _read_csv_tail(file_path, nrows, block_size=1 << 22):
+        """
+        Header plus the last nrows lines of a CSV as an in-memory file
+        Newlines are counted backwards from EOF block by block, so only the kept tail is ever read
+        """
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            pos = f.seek(0, os.SEEK_END)
+            
+            # A newline at EOF terminates the last row instead of starting a new one
+            f.seek(max(pos - 1, 0))
+            needed = nrows + (f.read(1) == b'\n')
+            
+            tail_start = len(header)
+            while pos > len(header):
+                block_start = max(pos - block_size, len(header))
+                f.seek(block_start)
+                newlines = np.flatnonzero(np.frombuffer(f.read(pos - block_start), dtype=np.uint8) == 0x0A)
+                if len(newlines) >= needed:
+                    tail_start = block_start + int(newlines[-needed]) + 1
+                    break
+                needed -= len(newlines)
+                pos = block_start
+            
+            f.seek(tail_start)
+            return io.BytesIO(header + f.read())
+    
     def _load_csv_optimized(self, file_path, timeframe):
         """Optimized CSV loading with smart truncation"""
         start_time = time.time()
         
-        dtypes = {
-            'Open': np.float32,
-            'High': np.float32,
-            'Low': np.float32,
-            'Close': np.float32,
-            'Volume': np.int32
-        }
-        
-        if CONTINUITY_CONFIG['smart_truncation']['enabled']:
-            nrows = CONTINUITY_CONFIG['smart_truncation']['max_rows']
-            df = pd.read_csv(file_path, nrows=nrows, dtype=dtypes, engine='c')
-            
-            if CONTINUITY_CONFIG['smart_truncation']['keep_recent']:
-                total_rows = sum(1 for _ in open(file_path)) - 1
-                if total_rows > nrows:
-                    skiprows = total_rows - nrows + 1
-                    df = pd.read_csv(file_path, skiprows=range(1, skiprows), dtype=dtypes, engine='c')
+        truncation = CONTINUITY_CONFIG['smart_truncation']
+        if truncation['enabled'] and truncation['keep_recent']:
+            df = self._read_csv_arrow(self._read_csv_tail(file_path, truncation['max_rows']))
+        elif truncation['enabled']:
+            df = self._read_csv_arrow(file_path, nrows=truncation['max_rows'])
         else:
-            df = pd.read_csv(file_path, dtype=dtypes, engine='c')
+            df = self._read_csv_arrow(file_path)
         
         try:
-            if 'Time' in df.columns:
-                df['DateTime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'], format='%m/%d/%Y %H:%M')
-            else:
-                # For daily data without time column, set to market open time
-                df['DateTime'] = pd.to_datetime(df['Date'] + ' 09:30:00', format='%m/%d/%Y %H:%M:%S')
+            # For daily data without time column, set to market open time
+            times = df['Time'] if 'Time' in df.columns else None
+            timestamps = self._parse_timestamps(df['Date'], times)
+            df['DateTime'] = timestamps.astype('datetime64[s]').astype('datetime64[ns]')
+            df['timestamp'] = timestamps
         except:
             # Fallback to automatic parsing if format fails
             if 'Time' in df.columns:
-                df['DateTime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'])
+                df['DateTime'] = pd.to_datetime(df['Date'].astype(str) + ' ' + df['Time'].astype(str))
             else:
-                df['DateTime'] = pd.to_datetime(df['Date'] + ' 09:30:00')
+                df['DateTime'] = pd.to_datetime(df['Date'].astype(str) + ' 09:30:00')
+            df['timestamp'] = df['DateTime'].astype(np.int64) // 10**9
         
-        df['timestamp'] = df['DateTime'].astype(np.int64) // 10**9
+        # UTC day number - cheap integer key for per-date lookups
+        df['date_ord'] = (df['timestamp'].to_numpy() // 86400).astype(np.int32)
         
         if 'VWAP' in df.columns:
             df = df.drop('VWAP', axis=1)
         
+        # Intraday bar volumes fit in uint16; higher timeframes that don't keep int32 - never clip
+        volume = df['Volume'].to_numpy()
+        if len(volume) > 0 and volume.min() >= 0 and volume.max() <= np.iinfo(np.uint16).max:
+            df['Volume'] = volume.astype(np.uint16)
+        
         logger.info(f"Loaded {file_path.name} in {time.time() - start_time:.2f}s")
         
         return df
     
-    def get_data_for_date(self, target_date, timeframe='M15', candle_count=DEFAULT_CANDLE_COUNT):
-        """Get data for a specific date and timeframe - optimized version"""
+    @staticmethod
+    def _parse_timestamps(dates, times=None):
+        """
+        Epoch seconds from the CSV's '%m/%d/%Y' Date and '%H:%M' Time columns
+        Each distinct date and time string is parsed once, then broadcast back by factorize codes
+        """
+        date_codes, unique_dates = pd.factorize(dates)
+        day_seconds = pd.to_datetime(unique_dates, format='%m/%d/%Y').values.astype('datetime64[s]').astype(np.int64)
+        
+        if times is None:
+            return day_seconds[date_codes] + (9 * 60 + 30) * 60
+            
+        time_codes, unique_times = pd.factorize(times)
+        parsed_times = pd.to_datetime(unique_times, format='%H:%M')
+        time_seconds = (parsed_times.hour * 3600 + parsed_times.minute * 60).to_numpy(dtype=np.int64)
+        return day_seconds[date_codes] + time_seconds[time_codes]
+    
+    @staticmethod
+    def date_to_ordinal(target_date):
+        """Convert a date (string, date or Timestamp) to its UTC day number"""
+        if isinstance(target_date, datetime):
+            target_date = target_date.date()
+        elif not isinstance(target_date, date):
+            target_date = pd.to_datetime(target_date).date()
+        return (target_date - EPOCH_DATE).days
+    
+    @staticmethod
+    def ordinal_to_date(date_ord):
+        """Convert a UTC day number back to a date"""
+        return EPOCH_DATE + timedelta(days=int(date_ord))
+    
+    @staticmethod
+    def ordinal_to_date_str(date_ord):
+        """Convert a UTC day number back to YYYY-MM-DD"""
+        return DataProcessor.ordinal_to_date(date_ord).strftime('%Y-%m-%d')
+    
+    def get_rows_for_date(self, target_date, timeframe='M1'):
+        """Get all candles whose UTC date equals target_date - a row slice view of the loaded frame"""
+        if timeframe not in self.loaded_data:
+            return None
+            
+        day_slice = self.date_index[timeframe].get(self.date_to_ordinal(target_date), slice(0, 0))
+        return self.loaded_data[timeframe].iloc[day_slice]
+    
+    def get_columns_for_date(self, target_date, timeframe, columns):
+        """
+        Only the named columns of a date's rows, as numpy views of the loaded frame - nothing copied
+        Columns the timeframe doesn't have are left out
+        """
+        if timeframe not in self.loaded_data:
+            return None
+            
+        df = self.loaded_data[timeframe]
+        day_slice = self.date_index[timeframe].get(self.date_to_ordinal(target_date), slice(0, 0))
+        return {name: df[name].to_numpy()[day_slice] for name in columns if name in df.columns}
+    
+    def get_range_for_date(self, target_date, timeframe='M15', candle_count=DEFAULT_CANDLE_COUNT):
+        """Row positions (start, end) of the candles get_data_for_date returns, or None if there are none"""
         if timeframe not in self.loaded_data:
             logger.error(f"Timeframe {timeframe} not loaded")
             return None
             
-        df = self.loaded_data[timeframe]  # Don't copy, work with reference
-        
         if isinstance(target_date, str):
             target_date = pd.to_datetime(target_date).date()
             
         # Restore original logic but ensure data comes from the correct date range
-        # Use vectorized filtering for better performance
         target_datetime = pd.to_datetime(target_date)
         
         # Define a reasonable cutoff time (end of trading day in UTC)
         # This ensures we get data from the trading session but avoid cross-date contamination
         cutoff_time = target_datetime.replace(hour=22, minute=0)  # 22:00 UTC = approx market close
         
-        # Use boolean indexing directly without intermediate filtering
-        mask = df['DateTime'] <= cutoff_time
-        filtered_indices = df.index[mask]
+        # Rows are in time order, so everything up to the cutoff is a prefix - binary search its end
+        end_idx = int(np.searchsorted(self.timestamps[timeframe], cutoff_time.value // 10**9, side='right'))
         
-        if len(filtered_indices) == 0:
+        if end_idx == 0:
             return None
             
-        # Get the last N rows more efficiently
-        start_idx = max(0, len(filtered_indices) - candle_count)
-        selected_indices = filtered_indices[start_idx:]
+        # Last N rows up to the cutoff as one contiguous slice
+        return max(0, end_idx - candle_count), end_idx
+    
+    def get_data_for_date(self, target_date, timeframe='M15', candle_count=DEFAULT_CANDLE_COUNT):
+        """Get data for a specific date and timeframe - optimized version"""
+        row_range = self.get_range_for_date(target_date, timeframe, candle_count)
+        if row_range is None:
+            return None
+            
+        start_idx, end_idx = row_range
+        df = self.loaded_data[timeframe]  # Don't copy, work with reference
         
-        result_df = df.iloc[selected_indices].copy()  # Only copy the final result
+        # Row slice is a view of the loaded frame, not a copy - callers must treat it as read-only
+        result_df = df.iloc[start_idx:end_idx]
         
         # Debug logging to check data continuity
         if len(result_df) > 1:
@@ -173,75 +438,79 @@ class DataProcessor:
             last_time = result_df.iloc[-1]['DateTime']
             logger.info(f"Loaded {len(result_df)} candles for {target_date} in {timeframe}: {first_time} to {last_time}")
         
-        return result_df.reset_index(drop=True)
+        return result_df.set_axis(pd.RangeIndex(len(result_df)), copy=False)
     
     def get_random_date_data(self, timeframe='M15'):
         """Get data for a random trading date - optimized version"""
-        if timeframe not in self.loaded_data:
+        random_date = self.get_random_date(timeframe)
+        
+        if random_date is None:
             return None
             
-        df = self.loaded_data[timeframe]
+        return self.get_data_for_date(random_date, timeframe)
         
-        # Use value_counts for better performance
-        date_counts = df['Date'].value_counts()
-        # Adjust minimum candle count based on timeframe
-        min_candles = {
-            'M1': 20, 'M5': 15, 'M15': 10, 
-            'H1': 5, 'H4': 3, 'D1': 1
-        }
-        min_count = min_candles.get(timeframe, 5)
-        valid_dates = date_counts[date_counts >= min_count].index.tolist()
+    def get_random_date(self, timeframe='M15'):
+        """Pick a random trading date with enough candles in the given timeframe"""
+        valid_dates = self.valid_dates.get(timeframe)
         
-        if not valid_dates:
+        if valid_dates is None or len(valid_dates) == 0:
             return None
             
-        random_date = np.random.choice(valid_dates)
-        
-        return self.get_data_for_date(random_date, timeframe)
-        
-    def get_common_random_date(self):
-        """Get a random date that has data available in ALL timeframes"""
-        all_dates = set()
+        return np.random.choice(valid_dates)
+    
+    @staticmethod
+    def _build_date_index(df):
+        """Map each UTC day number to its row slice - rows are in time order, so every day is one contiguous run"""
+        date_ords = df['date_ord'].to_numpy()
+        if len(date_ords) == 0:
+            return {}
+            
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(date_ords)) + 1))
+        ends = np.append(starts[1:], len(date_ords))
+        return {
+            int(date_ord): slice(int(start), int(end))
+            for date_ord, start, end in zip(date_ords[starts], starts, ends)
+        }
+    
+    @staticmethod
+    def _count_valid_dates(df, timeframe):
+        """Dates with enough candles to be offered as random dates - counted once per load"""
+        date_counts = df['Date'].value_counts()
+        # Adjust minimum candle count based on timeframe
+        min_count = MIN_CANDLES_PER_DATE.get(timeframe, 5)
+        return np.array(sorted(date_counts[date_counts >= min_count].index.tolist()))
         
-        # Get dates from each timeframe that have sufficient data
-        timeframe_dates = {}
-        min_candles = {
-            'M1': 20, 'M5': 15, 'M15': 10, 
-            'H1': 5, 'H4': 3, 'D1': 1
+    def _compute_common_dates(self):
+        """Build the set of dates that have data available in ALL timeframes"""
+        timeframe_dates = {
+            timeframe: set(self.valid_dates[timeframe].tolist())
+            for timeframe in ['M1', 'M5', 'M15', 'H1', 'H4', 'D1']
+            if timeframe in self.valid_dates
         }
         
-        for timeframe in ['M1', 'M5', 'M15', 'H1', 'H4', 'D1']:
-            if timeframe not in self.loaded_data:
-                continue
-                
-            df = self.loaded_data[timeframe]
-            date_counts = df['Date'].value_counts()
-            min_count = min_candles.get(timeframe, 5)
-            valid_dates = date_counts[date_counts >= min_count].index.tolist()
-            
-            timeframe_dates[timeframe] = set(valid_dates)
-            
-            if not all_dates:
-                all_dates = set(valid_dates)
-            else:
-                all_dates = all_dates.intersection(set(valid_dates))
+        all_dates = set.intersection(*timeframe_dates.values()) if timeframe_dates else set()
         
         if not all_dates:
             # Fallback: if no common dates, use M1 dates as priority
             logger.warning("No common dates found across all timeframes, using M1 dates as fallback")
-            if 'M1' in timeframe_dates:
-                all_dates = timeframe_dates['M1']
-            else:
-                return None
-                
-        # Convert to list and select random date
-        common_dates = list(all_dates)
-        if not common_dates:
+            all_dates = timeframe_dates.get('M1', set())
+        
+        self.common_dates = np.array(sorted(all_dates))
+        logger.info(f"Common dates across {len(timeframe_dates)} timeframes: {len(self.common_dates)}")
+        
+        return self.common_dates
+        
+    def get_common_random_date(self):
+        """Get a random date that has data available in ALL timeframes"""
+        if self.common_dates is None:
+            self._compute_common_dates()
+            
+        if len(self.common_dates) == 0:
             return None
             
-        random_date = np.random.choice(common_dates)
+        random_date = np.random.choice(self.common_dates)
         
-        logger.info(f"Selected common random date: {random_date} (available in {len([tf for tf, dates in timeframe_dates.items() if random_date in dates])} timeframes)")
+        logger.info(f"Selected common random date: {random_date}")
         
         return random_date
     
@@ -250,27 +519,19 @@ class DataProcessor:
         if df is None or df.empty:
             return []
             
-        # Use vectorized operations instead of iterrows for much better performance
-        chart_data = {
-            'time': df['timestamp'].astype(int).tolist(),
-            'open': df['Open'].astype(float).tolist(),
-            'high': df['High'].astype(float).tolist(),
-            'low': df['Low'].astype(float).tolist(),
-            'close': df['Close'].astype(float).tolist(),
-            'volume': df['Volume'].astype(int).tolist()
-        }
-        
-        # Convert to list of dictionaries
+        # numpy's C-level tolist() yields native int/float straight from the stored
+        # float32 / uint16 columns (no widened copies first), so the result needs no
+        # further JSON coercion; zip the columns instead of indexing per row
         return [
-            {
-                'time': chart_data['time'][i],
-                'open': chart_data['open'][i],
-                'high': chart_data['high'][i],
-                'low': chart_data['low'][i],
-                'close': chart_data['close'][i],
-                'volume': chart_data['volume'][i]
-            }
-            for i in range(len(chart_data['time']))
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, o, h, l, c, v in zip(
+                df['timestamp'].to_numpy().tolist(),
+                df['Open'].to_numpy().tolist(),
+                df['High'].to_numpy().tolist(),
+                df['Low'].to_numpy().tolist(),
+                df['Close'].to_numpy().tolist(),
+                df['Volume'].to_numpy().tolist()
+            )
         ]
     
     def _convert_to_json_serializable(self, obj):
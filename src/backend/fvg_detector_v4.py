@@ -7,8 +7,169 @@ import pandas as pd
 import numpy as np
 import logging
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Without numba detection falls back to the NumPy mask scan (_scan_fvgs_numpy)
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+FVG_NONE = 0
+FVG_BULLISH = 1
+FVG_BEARISH = -1
+
+# Compiled kernel is cached in __pycache__ under this module's import path (backend.fvg_detector_v4).
+# Serial on purpose: chart windows are a few hundred bars, where a thread-pool launch costs more than the scan.
+@njit(cache=True, nogil=True)
+def _scan_fvgs(open_prices, high_prices, low_prices, close_prices, max_lookback):
+    """
+    Fused bar-wise FVG scan and clear lookup over raw arrays, L=i-2, C=i-1, R=i
+    Returns parallel arrays (detection_index, kind, cleared_index) with one entry per FVG;
+    cleared_index is -1 if not cleared
+    """
+    n = len(close_prices)
+    detection = np.empty(n, dtype=np.int64)
+    kind = np.empty(n, dtype=np.int8)
+    cleared = np.full(n, -1, dtype=np.int64)
+    count = 0
+    
+    for i in range(2, n):
+        left_high = high_prices[i - 2]
+        left_low = low_prices[i - 2]
+        middle_open = open_prices[i - 1]
+        middle_close = close_prices[i - 1]
+        
+        if middle_close > middle_open and middle_close > left_high and left_high < low_prices[i]:
+            detection[count] = i
+            kind[count] = FVG_BULLISH
+            # Cleared by any later close below L.High
+            for j in range(i + 1, min(i + max_lookback + 1, n)):
+                if close_prices[j] < left_high:
+                    cleared[count] = j
+                    break
+            count += 1
+        elif middle_close < middle_open and middle_close < left_low and left_low > high_prices[i]:
+            detection[count] = i
+            kind[count] = FVG_BEARISH
+            # Cleared by any later close above L.Low
+            for j in range(i + 1, min(i + max_lookback + 1, n)):
+                if close_prices[j] > left_low:
+                    cleared[count] = j
+                    break
+            count += 1
+    
+    return detection[:count], kind[:count], cleared[:count]
+
+def _fvg_kinds(open_prices, high_prices, low_prices, close_prices):
+    """
+    Same FVG rules as _scan_fvgs, evaluated on all (L, C, R) triplets at once with shifted slices
+    Returns kind per confirming candle R
+    """
+    left_high = high_prices[:-2]
+    left_low = low_prices[:-2]
+    middle_open = open_prices[1:-1]
+    middle_close = close_prices[1:-1]
+    
+    bullish = (middle_close > middle_open) & (middle_close > left_high) & (left_high < low_prices[2:])
+    bearish = (middle_close < middle_open) & (middle_close < left_low) & (left_low > high_prices[2:])
+    
+    kind = np.zeros(len(close_prices), dtype=np.int8)
+    kind[2:][bullish] = FVG_BULLISH
+    kind[2:][bearish] = FVG_BEARISH
+    return kind
+
+def _scan_fvgs_numpy(open_prices, high_prices, low_prices, close_prices, max_lookback):
+    """NumPy equivalent of _scan_fvgs, used when numba is not installed"""
+    all_kinds = _fvg_kinds(open_prices, high_prices, low_prices, close_prices)
+    fvg_idx = np.flatnonzero(all_kinds)
+    kind = all_kinds[fvg_idx]
+    cleared = np.full(len(fvg_idx), -1, dtype=np.int64)
+    
+    if len(fvg_idx) == 0 or max_lookback < 1:
+        return fvg_idx, kind, cleared
+    
+    # All FVGs are resolved in one pass: row k holds the max_lookback closes after FVG k.
+    # The tail is padded with NaN, which never clears, so rows near the end stay full width.
+    padded_closes = np.concatenate((close_prices, np.full(max_lookback, np.nan)))
+    later_closes = np.lib.stride_tricks.sliding_window_view(padded_closes, max_lookback)[fvg_idx + 1]
+    
+    # Bullish cleared by a close below L.High, bearish by a close above L.Low
+    is_bullish = kind == FVG_BULLISH
+    levels = np.where(is_bullish, high_prices[fvg_idx - 2], low_prices[fvg_idx - 2])[:, None]
+    cleared_mask = np.where(is_bullish[:, None], later_closes < levels, later_closes > levels)
+    
+    hit = cleared_mask.any(axis=1)
+    cleared[hit] = fvg_idx[hit] + 1 + cleared_mask.argmax(axis=1)[hit]
+    return fvg_idx, kind, cleared
+
+_fvg_scan = _scan_fvgs if NUMBA_AVAILABLE else _scan_fvgs_numpy
+
+class FVGResult:
+    """
+    Detected FVGs as parallel NumPy columns, one entry per FVG
+    Indexing returns the same dict the frontend receives; to_dicts() converts all of them at the JSON boundary
+    """
+    
+    def __init__(self, detection_index, kind, top_price, bottom_price, start_time, end_time, cleared_index):
+        self.detection_index = detection_index  # Confirming candle R
+        self.kind = kind                        # FVG_BULLISH / FVG_BEARISH
+        self.top_price = top_price
+        self.bottom_price = bottom_price
+        self.start_time = start_time            # L timestamp
+        self.end_time = end_time                # L+40 timestamp
+        self.cleared_index = cleared_index      # -1 if not cleared
+        
+    @classmethod
+    def empty(cls):
+        index = np.empty(0, dtype=np.int64)
+        prices = np.empty(0, dtype=np.float32)
+        return cls(index, np.empty(0, dtype=np.int8), prices, prices, index, index, index)
+        
+    def __len__(self):
+        return len(self.detection_index)
+    
+    def __getitem__(self, i):
+        return self._record(
+            self.detection_index[i].item(), self.kind[i].item(), self.top_price[i].item(),
+            self.bottom_price[i].item(), self.start_time[i].item(), self.end_time[i].item(),
+            self.cleared_index[i].item()
+        )
+    
+    def to_dicts(self):
+        """List of FVG dicts, in detection order"""
+        return [
+            self._record(*row) for row in zip(
+                self.detection_index.tolist(), self.kind.tolist(), self.top_price.tolist(),
+                self.bottom_price.tolist(), self.start_time.tolist(), self.end_time.tolist(),
+                self.cleared_index.tolist()
+            )
+        ]
+    
+    @staticmethod
+    def _record(detection_idx, kind, top_price, bottom_price, start_time, end_time, cleared_idx):
+        fvg = {
+            'type': 'bullish' if kind == FVG_BULLISH else 'bearish',
+            'topPrice': top_price,
+            'bottomPrice': bottom_price,
+            'startTime': start_time,
+            'endTime': end_time,
+            'detectionIndex': detection_idx,
+            'leftIndex': detection_idx - 2,
+            'middleIndex': detection_idx - 1,
+            'status': 'valid'
+        }
+        if cleared_idx >= 0:
+            fvg['status'] = 'cleared'
+            fvg['clearedIndex'] = cleared_idx
+        return fvg
+
 class FVGDetectorV4:
     def __init__(self, max_lookback=40):
         self.max_lookback = max_lookback
@@ -139,111 +300,71 @@ class FVGDetectorV4:
         return None
     
     def detect_fvgs_vectorized(self, df):
+        """FVGs for the window as a list of dicts - see detect_fvgs_columnar"""
+        return self.detect_fvgs_columnar(df).to_dicts()
+    
+    def detect_fvgs_columnar(self, df):
         """
-        Basic for-loop FVG detection - checking every single candle in the 400 displayed candles
-        No vectorization to ensure no candles are skipped
+        Check every candle in the displayed range for FVGs - no candles are skipped
         L=index-2, C=index-1, R=index (current candle confirms FVG)
+        The bar-wise scan runs on raw column arrays - numba kernel, or NumPy masks without numba
+        Returns an FVGResult
         """
         if len(df) < 3:
-            return []
+            return FVGResult.empty()
             
-        fvgs = []
-        data_length = len(df)
+        detection, kind, cleared = self.scan_timeframe(df)
+        result = self._build_result(df, detection, kind, cleared)
         
-        # Check every candle from index 2 onwards (need at least 3 candles: L, C, R)
-        for i in range(2, data_length):
-            left_idx = i - 2    # L position
-            middle_idx = i - 1  # C position  
-            current_idx = i     # R position (confirming candle)
-            
-            # Get candle data
-            left_open = df.iloc[left_idx]['Open']
-            left_high = df.iloc[left_idx]['High']
-            left_low = df.iloc[left_idx]['Low']
-            left_close = df.iloc[left_idx]['Close']
-            
-            middle_open = df.iloc[middle_idx]['Open']
-            middle_high = df.iloc[middle_idx]['High']
-            middle_low = df.iloc[middle_idx]['Low']
-            middle_close = df.iloc[middle_idx]['Close']
-            
-            right_open = df.iloc[current_idx]['Open']
-            right_high = df.iloc[current_idx]['High']
-            right_low = df.iloc[current_idx]['Low']
-            right_close = df.iloc[current_idx]['Close']
-            
-            # Check for Bullish FVG
-            # 1. C.Close > C.Open (middle candle is bullish)
-            # 2. C.Close > L.High (middle close > left high)  
-            # 3. L.High < R.Low (gap between left high and right low)
-            is_bullish_fvg = (
-                middle_close > middle_open and
-                middle_close > left_high and
-                left_high < right_low
-            )
-            
-            if is_bullish_fvg:
-                # Calculate display end time (L + 40 candles)
-                end_idx = min(left_idx + 40, data_length - 1)
-                
-                fvg = {
-                    'type': 'bullish',
-                    'topPrice': float(right_low),       # R.Low (upper boundary)
-                    'bottomPrice': float(left_high),    # L.High (lower boundary)
-                    'startTime': int(df.iloc[left_idx]['timestamp']),     # L timestamp
-                    'endTime': int(df.iloc[end_idx]['timestamp']),        # L+40 timestamp
-                    'detectionIndex': current_idx,      # Current confirming candle
-                    'leftIndex': left_idx,
-                    'middleIndex': middle_idx,
-                    'status': 'valid'
-                }
-                
-                # Check if cleared after detection
-                cleared_idx = self._check_fvg_cleared(df, current_idx, left_high, 'bullish')
-                if cleared_idx is not None:
-                    fvg['status'] = 'cleared'
-                    fvg['clearedIndex'] = cleared_idx
-                
-                fvgs.append(fvg)
-                logger.debug(f"Bullish FVG detected at candle {current_idx}: L{left_high} < R{right_low}, gap={right_low-left_high}")
-            
-            # Check for Bearish FVG
-            # 1. C.Close < C.Open (middle candle is bearish)
-            # 2. C.Close < L.Low (middle close < left low)
-            # 3. L.Low > R.High (gap between left low and right high)
-            is_bearish_fvg = (
-                middle_close < middle_open and
-                middle_close < left_low and
-                left_low > right_high
-            )
+        bullish_count = int((kind == FVG_BULLISH).sum())
+        logger.info(f"FVG scan: Checked {len(df)-2} candles, detected {len(result)} total FVGs: {bullish_count} bullish, {len(result) - bullish_count} bearish")
+        
+        return result
+    
+    def scan_timeframe(self, df):
+        """
+        Run the FVG scan once over a whole frame
+        Returns (detection_index, kind, cleared_index) arrays in row positions, ascending by detection index
+        """
+        if len(df) < 3:
+            empty = FVGResult.empty()
+            return empty.detection_index, empty.kind, empty.cleared_index
             
-            if is_bearish_fvg:
-                # Calculate display end time (L + 40 candles)
-                end_idx = min(left_idx + 40, data_length - 1)
-                
-                fvg = {
-                    'type': 'bearish',
-                    'topPrice': float(left_low),        # L.Low (upper boundary)
-                    'bottomPrice': float(right_high),   # R.High (lower boundary)
-                    'startTime': int(df.iloc[left_idx]['timestamp']),     # L timestamp
-                    'endTime': int(df.iloc[end_idx]['timestamp']),        # L+40 timestamp
-                    'detectionIndex': current_idx,      # Current confirming candle
-                    'leftIndex': left_idx,
-                    'middleIndex': middle_idx,
-                    'status': 'valid'
-                }
-                
-                # Check if cleared after detection
-                cleared_idx = self._check_fvg_cleared(df, current_idx, left_low, 'bearish')
-                if cleared_idx is not None:
-                    fvg['status'] = 'cleared'
-                    fvg['clearedIndex'] = cleared_idx
-                
-                fvgs.append(fvg)
-                logger.debug(f"Bearish FVG detected at candle {current_idx}: L{left_low} > R{right_high}, gap={left_low-right_high}")
+        return _fvg_scan(
+            df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), self.max_lookback
+        )
+    
+    def fvgs_in_range(self, df, scan, start, end):
+        """
+        The FVGResult detect_fvgs_columnar(df.iloc[start:end]) returns, cut from scan_timeframe(df)
+        Only triplets fully inside the window count, indices are rebased to the window, and clears
+        at or after end are dropped - the window scan never sees those candles
+        """
+        detection, kind, cleared = scan
+        first, last = np.searchsorted(detection, [start + 2, end])
         
-        bullish_count = len([f for f in fvgs if f['type'] == 'bullish'])
-        bearish_count = len([f for f in fvgs if f['type'] == 'bearish'])
-        logger.info(f"FOR-LOOP: Checked {data_length-2} candles, detected {len(fvgs)} total FVGs: {bullish_count} bullish, {bearish_count} bearish")
+        cleared = cleared[first:last]
+        cleared = np.where((cleared >= 0) & (cleared < end), cleared - start, -1)
+        
+        return self._build_result(df.iloc[start:end], detection[first:last] - start, kind[first:last], cleared)
+    
+    @staticmethod
+    def _build_result(df, detection, kind, cleared):
+        """Gather prices and times for scan output whose indices are row positions in df"""
+        high_prices = df['High'].to_numpy()
+        low_prices = df['Low'].to_numpy()
+        timestamps = df['timestamp'].to_numpy()
         
-        return fvgs
\ No newline at end of file
+        left = detection - 2
+        is_bullish = kind == FVG_BULLISH
+        return FVGResult(
+            detection_index=detection,
+            kind=kind,
+            # Bullish: R.Low / L.High, bearish: L.Low / R.High
+            top_price=np.where(is_bullish, low_prices[detection], low_prices[left]),
+            bottom_price=np.where(is_bullish, high_prices[left], high_prices[detection]),
+            start_time=timestamps[left],
+            # Display end time (L + 40 candles)
+            end_time=timestamps[np.minimum(left + 40, len(df) - 1)],
+            cleared_index=cleared
+        )
@@ -0,0 +1,17 @@
+"""
+Gunicorn settings for production deployment
+Run from src: gunicorn -c backend/gunicorn.conf.py backend.app:app
+"""
+
+from utils.config import FLASK_CONFIG
+
+bind = f"{FLASK_CONFIG['HOST']}:{FLASK_CONFIG['PORT']}"
+worker_class = 'gevent'
+workers = FLASK_CONFIG['WORKERS']
+worker_connections = FLASK_CONFIG['MAX_CONNECTIONS']
+timeout = 120
+
+def post_worker_init(worker):
+    """Each worker loads its data in the background once it is up"""
+    from backend.app import start_data_loading
+    start_data_loading()
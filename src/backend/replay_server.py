@@ -3,38 +3,113 @@ Replay Server for K-line playback functionality
 Provides real-time streaming of historical candle data
 """
 
-import pandas as pd
-import json
+import numpy as np
+import orjson
 import time
 import threading
 from datetime import datetime, timedelta
 from typing import Generator, Dict, Optional, List
 import logging
-import sys
-from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import TIMEFRAMES
+from utils.config import TIMEFRAMES, REPLAY_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Timeframes synchronized to the M1 tick, in payload order
+SYNC_TIMEFRAMES = tuple(timeframe for timeframe in TIMEFRAMES if timeframe != 'M1')
+
+# The only columns replay reads from the loaded frames
+REPLAY_COLUMNS = ('timestamp', 'Open', 'High', 'Low', 'Close', 'Volume')
+
+def _sse_event(payload) -> bytes:
+    """Frame one payload as a Server-Sent Events data message"""
+    return b'data: ' + orjson.dumps(payload) + b'\n\n'
+
+# Fixed control events, framed once at import
+_NO_DATA_EVENT = _sse_event({'error': 'No replay data loaded'})
+_PAUSED_HEARTBEAT_EVENT = _sse_event({'type': 'heartbeat', 'status': 'paused'})
+_FINISHED_EVENT = _sse_event({'type': 'finished', 'message': 'Multi-timeframe replay completed'})
+
+def _candle_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Replay arrays for one timeframe's date - indexed by position per tick, no Series per row
+    OHLC sits in one C-contiguous (n, 4) block in the loader's float32, so a candle's prices are one row
+    """
+    timestamps = columns['timestamp']
+    return {
+        'timestamp': timestamps,
+        'ohlc': np.column_stack([columns[name] for name in ('Open', 'High', 'Low', 'Close')]),
+        'Volume': columns['Volume'] if 'Volume' in columns else np.zeros(len(timestamps), dtype=np.int64)
+    }
+
+def _candle_at(columns: Dict[str, np.ndarray], index: int) -> Dict:
+    """Candle payload for one row of a column-array frame"""
+    timestamp = int(columns['timestamp'][index])
+    open_price, high_price, low_price, close_price = columns['ohlc'][index].tolist()
+    return {
+        'timestamp': timestamp,
+        'time': timestamp,
+        'open': open_price,
+        'high': high_price,
+        'low': low_price,
+        'close': close_price,
+        'volume': int(columns['Volume'][index])
+    }
+
+def _candle_payloads(columns: Dict[str, np.ndarray], timeframe: str) -> List[Dict]:
+    """Stream payload for every row of a column-array frame - whole columns go through tolist() once, no per-row casts"""
+    return [
+        {
+            'timeframe': timeframe,
+            'timestamp': timestamp,
+            'time': timestamp,
+            'open': open_price,
+            'high': high_price,
+            'low': low_price,
+            'close': close_price,
+            'volume': volume,
+            'index': index
+        }
+        for index, (timestamp, (open_price, high_price, low_price, close_price), volume) in enumerate(
+            zip(columns['timestamp'].tolist(), columns['ohlc'].tolist(), columns['Volume'].tolist())
+        )
+    ]
+
 class ReplayServer:
     def __init__(self, data_processor):
         self.data_processor = data_processor
+        self._playing = threading.Event()  # Set while playing - paused streams block on it
         self.is_playing = False
         self.current_session = None
         self.playback_thread = None
         self.speed = 1.0  # seconds per candle
         self.current_date = None
-        self.current_index = 0
+        self.current_index = 0  # Position of the most recently sent candle batch (or the seek target)
+        self._seek_version = 0  # Bumped by seek_to_index so running streams jump to _seek_index
+        self._seek_index = 0
         self.total_candles = 0
         self.subscribers = []  # For SSE connections
         
         # Multi-timeframe support
         self.multi_timeframe_mode = True  # Enable multi-timeframe by default
-        self.timeframe_data = {}  # Store data for all timeframes: {timeframe: dataframe}
-        self.timeframe_indices = {}  # Track current index for each timeframe
+        self.timeframe_data = {}  # Store data for all timeframes: {timeframe: {column: ndarray}}
+        self.timeframe_indices = {}  # Track current index for each timeframe - replaced, never mutated, while streaming
+        self.loaded_timeframes = ()  # Timeframes with data for the current date, in TIMEFRAMES order
         self.current_m1_timestamp = None  # Current M1 timestamp for synchronization
+        self.stream_frames = []  # Serialized SSE bytes per M1 index, built once in start_replay
+        self.stream_indices = []  # timeframe_indices snapshot per M1 index
+        self.legacy_frames = []  # Standalone M1 'candle' events, built on the first ?legacy=1 stream
+        
+    @property
+    def is_playing(self) -> bool:
+        return self._playing.is_set()
+    
+    @is_playing.setter
+    def is_playing(self, playing: bool):
+        if playing:
+            self._playing.set()
+        else:
+            self._playing.clear()
         
     def start_replay(self, date: str, speed: float = 1.0) -> Dict:
         """
@@ -55,13 +130,14 @@ class ReplayServer:
             loaded_timeframes = []
             for timeframe in TIMEFRAMES:
                 timeframe_data = self._load_date_data(date, timeframe)
-                if timeframe_data is not None and len(timeframe_data) > 0:
-                    self.timeframe_data[timeframe] = timeframe_data.sort_values('timestamp')
+                if timeframe_data is not None:
+                    self.timeframe_data[timeframe] = _candle_columns(timeframe_data)
                     self.timeframe_indices[timeframe] = 0
                     loaded_timeframes.append(timeframe)
-                    logger.info(f"Loaded {len(timeframe_data)} candles for {timeframe}")
+                    logger.info(f"Loaded {len(timeframe_data['timestamp'])} candles for {timeframe}")
                 else:
                     logger.warning(f"No data available for {timeframe} on {date}")
+            self.loaded_timeframes = tuple(loaded_timeframes)
             
             # Check if we have at least M1 data (minimum requirement)
             if 'M1' not in loaded_timeframes:
@@ -73,11 +149,12 @@ class ReplayServer:
             self.current_date = date
             self.speed = speed
             self.current_index = 0
-            self.total_candles = len(self.timeframe_data['M1'])
+            self.total_candles = len(self.timeframe_data['M1']['timestamp'])
             self.is_playing = False
             
             # Store M1 data as primary data for backward compatibility
             self.replay_data = self.timeframe_data['M1']
+            self._build_stream_frames()
             
             logger.info(f"Multi-timeframe replay prepared: {len(loaded_timeframes)} timeframes loaded for {date}")
             logger.info(f"Loaded timeframes: {loaded_timeframes}")
@@ -98,33 +175,29 @@ class ReplayServer:
                 'message': f'Failed to start replay: {str(e)}'
             }
     
-    def _load_date_data(self, date: str, timeframe: str) -> Optional[pd.DataFrame]:
+    def _load_date_data(self, date: str, timeframe: str) -> Optional[Dict[str, np.ndarray]]:
         """
-        Load data for specific date and timeframe
+        Load data for specific date and timeframe - just the replay columns, as views of the loaded frame
         """
         try:
             # Check if data is already loaded in data_processor
             if timeframe in self.data_processor.loaded_data:
-                df = self.data_processor.loaded_data[timeframe]
+                # Debug: Show data range for M1
+                if timeframe == 'M1':
+                    timestamps = self.data_processor.timestamps['M1']
+                    if len(timestamps) > 0:
+                        min_date = self.data_processor.ordinal_to_date(timestamps[0] // 86400)
+                        max_date = self.data_processor.ordinal_to_date(timestamps[-1] // 86400)
+                        logger.info(f"M1 data range: {min_date} to {max_date}, looking for {date}")
                 
-                # Filter for specific date
-                target_date = pd.to_datetime(date).date()
+                # Rows for the UTC date come straight from the integer date index, already in time order;
+                # only the columns replay sends are taken, and nothing is copied
+                date_columns = self.data_processor.get_columns_for_date(date, timeframe, REPLAY_COLUMNS)
                 
-                # Convert timestamp to datetime for filtering
-                if 'timestamp' in df.columns:
-                    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-                    
-                    # Debug: Show data range for M1
-                    if timeframe == 'M1':
-                        min_date = df['datetime'].min().date()
-                        max_date = df['datetime'].max().date()
-                        logger.info(f"M1 data range: {min_date} to {max_date}, looking for {target_date}")
-                    
-                    date_filtered = df[df['datetime'].dt.date == target_date].copy()
-                    
-                    if len(date_filtered) > 0:
-                        logger.info(f"Found {len(date_filtered)} candles for {date} in {timeframe}")
-                        return date_filtered.sort_values('timestamp')
+                candle_count = len(date_columns['timestamp'])
+                if candle_count > 0:
+                    logger.info(f"Found {candle_count} candles for {date} in {timeframe}")
+                    return date_columns
                     
             logger.warning(f"No data found for {date} in {timeframe}")
             return None
@@ -157,8 +230,12 @@ class ReplayServer:
         
         # Clear multi-timeframe data
         self.timeframe_data.clear()
-        self.timeframe_indices.clear()
+        self.timeframe_indices = {}
+        self.loaded_timeframes = ()
         self.current_m1_timestamp = None
+        self.stream_frames = []
+        self.stream_indices = []
+        self.legacy_frames = []
         
         self.subscribers.clear()
         logger.info("Multi-timeframe replay stopped and cleared")
@@ -180,7 +257,7 @@ class ReplayServer:
             'speed': self.speed,
             'progress': (self.current_index / self.total_candles * 100) if self.total_candles > 0 else 0,
             'multi_timeframe_mode': self.multi_timeframe_mode,
-            'loaded_timeframes': list(self.timeframe_data.keys()),
+            'loaded_timeframes': self.loaded_timeframes,
             'current_m1_timestamp': self.current_m1_timestamp
         }
         
@@ -190,196 +267,202 @@ class ReplayServer:
             
         return status
     
-    def candle_stream_generator(self) -> Generator[str, None, None]:
+    def candle_stream_generator(self, legacy: bool = False) -> Generator[bytes, None, None]:
         """
         Generator for Server-Sent Events (SSE) streaming with multi-timeframe support
         Yields synchronized candle data for all loaded timeframes
+        Args:
+            legacy: Also send the separate M1 'candle' event after each multi-timeframe one
         """
         if not hasattr(self, 'replay_data') or self.replay_data is None:
-            yield f"data: {json.dumps({'error': 'No replay data loaded'})}\n\n"
+            yield _NO_DATA_EVENT
             return
             
         logger.info("Starting multi-timeframe candle stream generator")
         
-        while self.current_index < len(self.replay_data) if self.replay_data is not None else 0:
+        if legacy and not self.legacy_frames:
+            self._build_legacy_frames()
+        
+        # The session's data is fixed once start_replay returns - bind it, and keep this stream's own
+        # cursor so concurrent subscribers don't advance each other; stop/restart swaps replay_data
+        data = self.replay_data
+        timestamps = data['timestamp']
+        stream_frames = self.stream_frames
+        stream_indices = self.stream_indices
+        legacy_frames = self.legacy_frames
+        total = self.total_candles
+        index = self.current_index
+        seek_version = self._seek_version
+        batch_interval = REPLAY_CONFIG['batch_interval']
+        max_batch = REPLAY_CONFIG['max_batch']
+        max_lag = REPLAY_CONFIG['max_lag']
+        
+        # Monotonic deadline for the next candle - keeps playback on schedule
+        # regardless of how long building/sending each frame took
+        next_deadline = None
+        
+        while index < total and self.replay_data is data:
             if not self.is_playing:
                 # If paused, still yield heartbeat to keep connection alive
-                yield f"data: {json.dumps({'type': 'heartbeat', 'status': 'paused'})}\n\n"
-                time.sleep(1)
+                yield _PAUSED_HEARTBEAT_EVENT
+                # Block until play is pressed (resumes immediately) or the next heartbeat is due
+                self._playing.wait(1)
+                next_deadline = None
                 continue
                 
             try:
-                # Get current M1 candle timestamp for synchronization
-                m1_candle_row = self.replay_data.iloc[self.current_index]
-                current_timestamp = int(m1_candle_row['timestamp'])
-                self.current_m1_timestamp = current_timestamp
-                
-                # Update M1 index in timeframe_indices
-                self.timeframe_indices['M1'] = self.current_index
-                
-                # Get synchronized candles for all timeframes
-                synchronized_candles = self._get_synchronized_candles(current_timestamp)
-                
-                # Create the multi-timeframe data package
-                multi_tf_data = {
-                    'type': 'multi_timeframe_candle',
-                    'timestamp': current_timestamp,
-                    'timeframes': synchronized_candles,
-                    'primary_timeframe': 'M1',
-                    'index': self.current_index,
-                    'progress': (self.current_index / self.total_candles * 100),
-                    'loaded_timeframes': list(self.timeframe_data.keys())
-                }
-                
-                # Also send individual candle for backward compatibility
-                if 'M1' in synchronized_candles:
-                    m1_candle = synchronized_candles['M1'].copy()
-                    m1_candle['type'] = 'candle'  # For backward compatibility
-                    
-                    # Send multi-timeframe data first
-                    yield f"data: {json.dumps(multi_tf_data)}\n\n"
+                # Pick up a seek made through the API since the last batch
+                if self._seek_version != seek_version:
+                    seek_version = self._seek_version
+                    index = self._seek_index
                     
-                    # Then send M1 candle for backward compatibility
-                    yield f"data: {json.dumps(m1_candle)}\n\n"
+                # At high speeds send several candles per write - one flush per batch_interval instead of per candle
+                speed = self.speed
+                if speed > 0:
+                    batch_size = min(max(1, int(batch_interval / speed)), max_batch)
                 else:
-                    # Fallback: send only multi-timeframe data
-                    yield f"data: {json.dumps(multi_tf_data)}\n\n"
+                    batch_size = max_batch
+                end_index = min(index + batch_size, total)
+                last_index = end_index - 1
+                
+                # Frames were serialized in start_replay - just publish the position and send them
+                self.current_index = end_index
+                self.current_m1_timestamp = int(timestamps[last_index])
+                self.timeframe_indices = stream_indices[last_index]
+                
+                frames = stream_frames[index:end_index]
+                if legacy:
+                    frames = [frame + m1_frame for frame, m1_frame in zip(frames, legacy_frames[index:end_index])]
+                yield b''.join(frames)
                 
-                # Move to next candle
-                self.current_index += 1
+                # Move past the batch
+                batch_seconds = speed * (end_index - index)
+                index = end_index
                 
                 # Wait according to speed setting
-                time.sleep(self.speed)
+                now = time.monotonic()
+                next_deadline = (next_deadline or now) + batch_seconds
+                if next_deadline > now:
+                    time.sleep(next_deadline - now)
+                else:
+                    # Fell behind (slow client) - resume pacing instead of bursting to catch up
+                    lag = now - next_deadline
+                    next_deadline = now
+                    
+                    # Writes block until the client takes the data, so nothing queues up server-side;
+                    # after a long stall, drop the candles that fell due meanwhile and tell the client
+                    # where playback continues instead of replaying the backlog late
+                    if speed > 0 and lag > max_lag:
+                        skipped = min(int(lag / speed), total - index)
+                        if skipped > 0:
+                            index += skipped
+                            self.current_index = index
+                            logger.warning(f"Replay client stalled {lag:.1f}s - skipped {skipped} candles")
+                            yield _sse_event({
+                                'type': 'resync',
+                                'index': index,
+                                'skipped': skipped,
+                                'progress': (index / total * 100)
+                            })
                 
             except Exception as e:
                 logger.error(f"Error in multi-timeframe candle stream: {str(e)}")
-                yield f"data: {json.dumps({'error': str(e), 'type': 'error'})}\n\n"
+                yield _sse_event({'error': str(e), 'type': 'error'})
                 break
         
-        # Stream finished
+        # Stream finished - only end playback if this stream's session is still the current one
         logger.info("Multi-timeframe candle stream finished")
-        self.is_playing = False
-        yield f"data: {json.dumps({'type': 'finished', 'message': 'Multi-timeframe replay completed'})}\n\n"
-    
-    def get_candle_at_index(self, index: int) -> Optional[Dict]:
-        """Get candle data at specific index"""
-        if not hasattr(self, 'replay_data') or self.replay_data is None:
-            return None
-            
-        if 0 <= index < len(self.replay_data):
-            candle_row = self.replay_data.iloc[index]
-            return {
-                'timestamp': int(candle_row['timestamp']),
-                'time': int(candle_row['timestamp']),
-                'open': float(candle_row['Open']),
-                'high': float(candle_row['High']),
-                'low': float(candle_row['Low']),
-                'close': float(candle_row['Close']),
-                'volume': int(candle_row.get('Volume', 0))
-            }
-        return None
+        if self.replay_data is data:
+            self.is_playing = False
+        yield _FINISHED_EVENT
     
-    def _get_synchronized_candles(self, m1_timestamp: int) -> Dict:
+    def _build_stream_frames(self):
         """
-        Get synchronized candles for all timeframes at given M1 timestamp
-        This is the core synchronization algorithm for multi-timeframe replay
+        Serialize the SSE frame for every M1 index up front - replay data is fixed once loaded,
+        so the stream loop only has to look the bytes up
         """
-        synchronized_candles = {}
+        frames = []
+        indices = []
+        # Candle JSON encoded once per timeframe row - the schema is fixed, so a frame only splices
+        # these fragments in, and a higher timeframe candle isn't re-encoded for every tick it spans
+        m1_candles = _candle_payloads(self.replay_data, 'M1')
+        m1_fragments = [orjson.Fragment(orjson.dumps(candle)) for candle in m1_candles]
+        synced = [
+            (
+                timeframe,
+                [orjson.Fragment(orjson.dumps(candle)) for candle in _candle_payloads(self.timeframe_data[timeframe], timeframe)],
+                tf_positions.tolist()
+            )
+            for timeframe, tf_positions in self._sync_positions().items()
+        ]
+        tick_indices = dict.fromkeys(self.timeframe_indices, 0)
         
-        # Always include M1 candle as the base
-        if 'M1' in self.timeframe_data:
-            m1_data = self.timeframe_data['M1']
-            m1_index = self.timeframe_indices.get('M1', 0)
-            
-            if m1_index < len(m1_data):
-                candle_row = m1_data.iloc[m1_index]
-                synchronized_candles['M1'] = {
-                    'timeframe': 'M1',
-                    'timestamp': int(candle_row['timestamp']),
-                    'time': int(candle_row['timestamp']),
-                    'open': float(candle_row['Open']),
-                    'high': float(candle_row['High']),
-                    'low': float(candle_row['Low']),
-                    'close': float(candle_row['Close']),
-                    'volume': int(candle_row.get('Volume', 0)),
-                    'index': m1_index
-                }
-        
-        # For other timeframes, find the candle that contains or is closest to this M1 timestamp
-        for timeframe in ['M5', 'M15', 'H1', 'H4', 'D1']:
-            if timeframe not in self.timeframe_data:
-                continue
-                
-            tf_data = self.timeframe_data[timeframe]
-            current_index = self.timeframe_indices.get(timeframe, 0)
+        for index, m1_candle in enumerate(m1_candles):
+            tick_indices['M1'] = index
+            synchronized_candles = {'M1': m1_fragments[index]}
             
-            # Find the appropriate candle for this timeframe
-            # We look for the candle that either contains this timestamp or is the most recent one
-            best_index = current_index
-            best_candle = None
-            
-            # Search forward and backward from current position to find best match
-            for search_index in range(max(0, current_index - 2), min(len(tf_data), current_index + 3)):
-                if search_index >= len(tf_data):
+            for timeframe, tf_candles, tf_positions in synced:
+                position = tf_positions[index]
+                if position < 0:
                     continue
                     
-                candle = tf_data.iloc[search_index]
-                candle_timestamp = int(candle['timestamp'])
-                
-                # Calculate timeframe duration in seconds
-                tf_duration = self._get_timeframe_duration_seconds(timeframe)
-                candle_start = candle_timestamp
-                candle_end = candle_timestamp + tf_duration
-                
-                # Check if M1 timestamp falls within this timeframe candle's time range
-                if candle_start <= m1_timestamp < candle_end:
-                    best_index = search_index
-                    best_candle = candle
-                    break
-                # Or if it's the most recent candle before our timestamp
-                elif candle_timestamp <= m1_timestamp:
-                    if best_candle is None or candle_timestamp > int(best_candle['timestamp']):
-                        best_index = search_index
-                        best_candle = candle
+                synchronized_candles[timeframe] = tf_candles[position]
+                tick_indices[timeframe] = position
             
-            if best_candle is not None:
-                # Update the index for this timeframe if we found a better match
-                if best_index != current_index:
-                    self.timeframe_indices[timeframe] = best_index
-                    
-                synchronized_candles[timeframe] = {
-                    'timeframe': timeframe,
-                    'timestamp': int(best_candle['timestamp']),
-                    'time': int(best_candle['timestamp']),
-                    'open': float(best_candle['Open']),
-                    'high': float(best_candle['High']),
-                    'low': float(best_candle['Low']),
-                    'close': float(best_candle['Close']),
-                    'volume': int(best_candle.get('Volume', 0)),
-                    'index': best_index
-                }
+            # Multi-timeframe data package - timeframes['M1'] is the M1 candle
+            frames.append(_sse_event({
+                'type': 'multi_timeframe_candle',
+                'timestamp': m1_candle['timestamp'],
+                'timeframes': synchronized_candles,
+                'primary_timeframe': 'M1',
+                'index': index,
+                'progress': (index / self.total_candles * 100),
+                'loaded_timeframes': self.loaded_timeframes
+            }))
+            indices.append(tick_indices.copy())
         
-        return synchronized_candles
+        self.stream_frames = frames
+        self.stream_indices = indices
     
-    def _get_timeframe_duration_seconds(self, timeframe: str) -> int:
-        """Get the duration of a timeframe in seconds"""
-        duration_map = {
-            'M1': 60,      # 1 minute
-            'M5': 300,     # 5 minutes  
-            'M15': 900,    # 15 minutes
-            'H1': 3600,    # 1 hour
-            'H4': 14400,   # 4 hours
-            'D1': 86400    # 1 day
+    def _sync_positions(self) -> Dict[str, np.ndarray]:
+        """
+        Core synchronization for multi-timeframe replay: for every M1 tick, the position of the
+        candle in each higher timeframe that contains it (or the most recent one before it)
+        Timestamps are sorted, so that is the last candle starting at or before the M1 timestamp -
+        one binary search per timeframe over all ticks; -1 where the timeframe has not started yet
+        """
+        m1_timestamps = self.replay_data['timestamp']
+        return {
+            timeframe: np.searchsorted(self.timeframe_data[timeframe]['timestamp'], m1_timestamps, side='right') - 1
+            for timeframe in SYNC_TIMEFRAMES
+            if timeframe in self.timeframe_data
         }
-        return duration_map.get(timeframe, 60)
+    
+    def _build_legacy_frames(self):
+        """Standalone M1 'candle' event per index, for clients that still listen for it"""
+        self.legacy_frames = [
+            _sse_event(dict(m1_candle, type='candle')) for m1_candle in _candle_payloads(self.replay_data, 'M1')
+        ]
+    
+    def get_candle_at_index(self, index: int) -> Optional[Dict]:
+        """Get candle data at specific index"""
+        if not hasattr(self, 'replay_data') or self.replay_data is None:
+            return None
+            
+        if 0 <= index < self.total_candles:
+            return _candle_at(self.replay_data, index)
+        return None
     
     def seek_to_index(self, index: int) -> Dict:
         """Seek to specific candle index"""
         if not hasattr(self, 'replay_data') or self.replay_data is None:
             return {'status': 'error', 'message': 'No replay data loaded'}
             
-        if 0 <= index < len(self.replay_data):
+        if 0 <= index < self.total_candles:
             self.current_index = index
+            # Running streams move their cursors here on their next batch
+            self._seek_index = index
+            self._seek_version += 1
             logger.info(f"Seeked to index {index}")
             return {'status': 'seeked', 'index': index}
         else:
@@ -2,6 +2,7 @@
 Time zone conversion utilities for the trading chart system
 """
 
+import calendar
 import pytz
 from datetime import datetime, timedelta, time
 import pandas as pd
@@ -12,9 +13,33 @@ class TimeZoneConverter:
         self.utc_tz = pytz.UTC
         self.taipei_tz = pytz.timezone('Asia/Taipei')
         self.ny_tz = pytz.timezone('America/New_York')
+        self.market_hours_table = {}  # {date: market hours dict}, filled by precompute_market_hours / on demand
+        
+        # New York's UTC transition table, taken once from pytz - entry i applies from transition i on,
+        # so the number of transitions at or before a timestamp indexes its offset
+        self._ny_transitions = np.array(
+            [calendar.timegm(t.timetuple()) for t in self.ny_tz._utc_transition_times[1:]], dtype=np.int64
+        )
+        self._ny_offsets = np.array(
+            [int(utcoffset.total_seconds()) for utcoffset, _, _ in self.ny_tz._transition_info], dtype=np.int64
+        )
+        self._ny_is_dst = np.array([dst != timedelta(0) for _, dst, _ in self.ny_tz._transition_info])
+        
+    def _ny_transition_index(self, utc_timestamp):
+        """Index into the New York transition table for epoch second(s) - scalar or ndarray"""
+        return np.searchsorted(self._ny_transitions, utc_timestamp, side='right')
+    
+    def ny_utc_offset(self, utc_timestamp):
+        """New York UTC offset in seconds for epoch second(s) - scalar or ndarray"""
+        return self._ny_offsets[self._ny_transition_index(utc_timestamp)]
         
     def is_dst(self, dt):
-        """Check if given datetime is in DST for New York"""
+        """
+        Check if given datetime is in DST for New York
+        Naive datetimes are New York wall time; epoch seconds (scalar or ndarray) are looked up in the transition table
+        """
+        if isinstance(dt, (int, float, np.integer, np.floating, np.ndarray)):
+            return self._ny_is_dst[self._ny_transition_index(dt)]
         if isinstance(dt, pd.Timestamp):
             dt = dt.to_pydatetime()
         ny_time = self.ny_tz.normalize(self.ny_tz.localize(dt.replace(tzinfo=None)))
@@ -43,6 +68,14 @@ class TimeZoneConverter:
         elif isinstance(date, pd.Timestamp):
             date = date.date()
             
+        market_hours = self.market_hours_table.get(date)
+        if market_hours is None:
+            market_hours = self._compute_market_hours_taipei(date)
+            self.market_hours_table[date] = market_hours
+        return market_hours
+    
+    def _compute_market_hours_taipei(self, date):
+        """Localize NY open/close for a date and convert to Taipei time"""
         ny_open = self.ny_tz.localize(datetime.combine(date, time(9, 30)))
         ny_close = self.ny_tz.localize(datetime.combine(date, time(16, 0)))
         
@@ -55,20 +88,27 @@ class TimeZoneConverter:
             'is_dst': ny_open.dst() != timedelta(0)
         }
     
+    def precompute_market_hours(self, dates):
+        """Fill the market hours table for the given dates up front"""
+        self.market_hours_table.update(
+            (date, self._compute_market_hours_taipei(date)) for date in dates
+        )
+    
     def filter_market_hours(self, df, date):
         """Filter dataframe to only include market hours (9:30 AM - 4:00 PM EST)"""
         if df.empty:
             return df
             
-        ny_times = df['timestamp'].apply(self.convert_utc_to_ny)
+        if isinstance(date, str):
+            date = pd.to_datetime(date).date()
+            
+        # Session bounds as epoch seconds - DST is settled once by localizing the day's open/close
+        open_timestamp = self.ny_tz.localize(datetime.combine(date, time(9, 30))).timestamp()
+        close_timestamp = self.ny_tz.localize(datetime.combine(date, time(16, 0))).timestamp()
+        
+        timestamps = df['timestamp'].to_numpy()
+        mask = (timestamps >= open_timestamp) & (timestamps <= close_timestamp)
         
-        mask = pd.Series([False] * len(df))
-        for i, ny_time in enumerate(ny_times):
-            if ny_time:
-                market_time = ny_time.time()
-                if time(9, 30) <= market_time <= time(16, 0):
-                    mask.iloc[i] = True
-                    
         return df[mask].reset_index(drop=True)
     
     def get_pre_market_window(self, df, date, minutes_before=5):
@@ -2,153 +2,250 @@
 US stock market holidays detection module
 """
 
-from datetime import datetime, date, timedelta
-import pandas as pd
+from datetime import datetime, date
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+
+@lru_cache(maxsize=4096)
+def _str_to_date(value):
+    """ISO date strings parse without pandas; anything else falls back to pd.to_datetime - cached per string"""
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return _pandas_to_date(value)
+
+def _pandas_to_date(value):
+    """Slow-path coercion through pd.to_datetime - pandas is only imported when this runs"""
+    import pandas as pd
+    return pd.to_datetime(value).date()
+
+# (year, holiday, month, day) - None where the holiday has no observed market closure that year
+_HOLIDAY_ROWS = (
+    (2019, 'new_year', 1, 1), (2019, 'mlk', 1, 21), (2019, 'presidents', 2, 18), (2019, 'good_friday', 4, 19), (2019, 'memorial', 5, 27),
+    (2019, 'independence', 7, 4), (2019, 'labor', 9, 2), (2019, 'thanksgiving', 11, 28), (2019, 'christmas', 12, 25),
+    (2020, 'new_year', 1, 1), (2020, 'mlk', 1, 20), (2020, 'presidents', 2, 17), (2020, 'good_friday', 4, 10), (2020, 'memorial', 5, 25),
+    (2020, 'independence', 7, 3), (2020, 'labor', 9, 7), (2020, 'thanksgiving', 11, 26), (2020, 'christmas', 12, 25),
+    (2021, 'new_year', 1, 1), (2021, 'mlk', 1, 18), (2021, 'presidents', 2, 15), (2021, 'good_friday', 4, 2), (2021, 'memorial', 5, 31),
+    (2021, 'independence', 7, 5), (2021, 'labor', 9, 6), (2021, 'thanksgiving', 11, 25), (2021, 'christmas', 12, 24),
+    (2022, 'new_year', None, None), (2022, 'mlk', 1, 17), (2022, 'presidents', 2, 21), (2022, 'good_friday', 4, 15), (2022, 'memorial', 5, 30),
+    (2022, 'juneteenth', 6, 20), (2022, 'independence', 7, 4), (2022, 'labor', 9, 5), (2022, 'thanksgiving', 11, 24), (2022, 'christmas', 12, 26),
+    (2023, 'new_year', 1, 2), (2023, 'mlk', 1, 16), (2023, 'presidents', 2, 20), (2023, 'good_friday', 4, 7), (2023, 'memorial', 5, 29),
+    (2023, 'juneteenth', 6, 19), (2023, 'independence', 7, 4), (2023, 'labor', 9, 4), (2023, 'thanksgiving', 11, 23), (2023, 'christmas', 12, 25),
+    (2024, 'new_year', 1, 1), (2024, 'mlk', 1, 15), (2024, 'presidents', 2, 19), (2024, 'good_friday', 3, 29), (2024, 'memorial', 5, 27),
+    (2024, 'juneteenth', 6, 19), (2024, 'independence', 7, 4), (2024, 'labor', 9, 2), (2024, 'thanksgiving', 11, 28), (2024, 'christmas', 12, 25),
+)
+
+# (year, month, day) of the early-close sessions
+_EARLY_CLOSE_ROWS = (
+    (2019, 7, 3), (2019, 11, 29), (2019, 12, 24),
+    (2020, 11, 27), (2020, 12, 24),
+    (2021, 11, 26),
+    (2022, 11, 25),
+    (2023, 7, 3), (2023, 11, 24),
+    (2024, 7, 3), (2024, 11, 29), (2024, 12, 24),
+)
+
+# Year-keyed tables built from the compact rows once at import
+HOLIDAYS_2019_2024 = {}
+for _year, _name, _month, _day in _HOLIDAY_ROWS:
+    HOLIDAYS_2019_2024.setdefault(_year, {})[_name] = None if _month is None else date(_year, _month, _day)
+
+EARLY_CLOSE_DAYS = {}
+for _year, _month, _day in _EARLY_CLOSE_ROWS:
+    EARLY_CLOSE_DAYS[_year] = EARLY_CLOSE_DAYS.get(_year, ()) + (date(_year, _month, _day),)
+del _year, _name, _month, _day
+
+# Flat date sets for O(1) membership checks - dates outside the covered years simply miss
+_HOLIDAYS = frozenset(h for holidays in HOLIDAYS_2019_2024.values() for h in holidays.values() if h is not None)
+_EARLY_CLOSE = frozenset(d for days in EARLY_CLOSE_DAYS.values() for d in days)
+
+# Calendar over the covered years as datetime64[D] day ordinals - the vectorized checks index
+# day flags by offset from _CALENDAR_START, no Python date objects involved
+_CALENDAR_START = date(min(HOLIDAYS_2019_2024), 1, 1)
+_CALENDAR_START_ORDINAL = _CALENDAR_START.toordinal()
+_HOLIDAY_ORDINALS = frozenset(day.toordinal() for day in _HOLIDAYS)
+_CALENDAR_DAYS = np.arange(
+    np.datetime64(_CALENDAR_START, 'D'), np.datetime64(date(max(HOLIDAYS_2019_2024) + 1, 1, 1), 'D')
+)
+_IS_HOLIDAY = np.isin(_CALENDAR_DAYS, np.array(sorted(_HOLIDAYS), dtype='datetime64[D]'))
+_IS_EARLY_CLOSE = np.isin(_CALENDAR_DAYS, np.array(sorted(_EARLY_CLOSE), dtype='datetime64[D]'))
+
+def _next_trading_offsets():
+    """
+    For each calendar day, the offset of the first trading day after it (-1 past the last one) -
+    weekends and holidays are flagged in one vectorized pass, so get_next_trading_day is a single lookup
+    """
+    # Epoch day 0 (1970-01-01) was a Thursday, so Monday-based weekday is (day + 3) % 7
+    weekday = (_CALENDAR_DAYS.astype(np.int64) + 3) % 7
+    non_trading = (weekday >= 5) | _IS_HOLIDAY
+    
+    trading_offsets = np.append(np.flatnonzero(~non_trading), -1)
+    return trading_offsets[np.searchsorted(trading_offsets[:-1], np.arange(len(_CALENDAR_DAYS)), side='right')]
+
+def _calendar_flags(flags, days):
+    """Look datetime64[D] days up in a calendar flag array - days outside the covered years are False / 0"""
+    offsets = (days - _CALENDAR_DAYS[0]).astype(np.int64)
+    inside = (offsets >= 0) & (offsets < len(flags))
+    result = np.zeros(len(days), dtype=flags.dtype)
+    result[inside] = flags[offsets[inside]]
+    return result
+
+_NEXT_TRADING_OFFSET = _next_trading_offsets()
+
+def _next_trading_days(days):
+    """
+    Vectorized get_next_trading_day over datetime64[D] days (NaT stays NaT) - the day after,
+    stepped past a weekend, then moved on through _NEXT_TRADING_OFFSET where that lands on a holiday
+    """
+    day_numbers = days.astype(np.int64)
+    candidate = day_numbers + 1
+    weekday = (candidate + 3) % 7
+    candidate += np.where(weekday == 5, 2, np.where(weekday == 6, 1, 0))
+    
+    start = _CALENDAR_DAYS[0].astype(np.int64)
+    on_holiday = np.flatnonzero(_calendar_flags(_IS_HOLIDAY, candidate.astype('datetime64[D]')))
+    candidate[on_holiday] = start + _NEXT_TRADING_OFFSET[candidate[on_holiday] - start]
+    
+    result = candidate.astype('datetime64[D]')
+    result[np.isnat(days)] = np.datetime64('NaT')
+    return result
+
+class HolidayInfo(NamedTuple):
+    """Holiday status of one date - use _asdict() for the JSON object shape"""
+    is_holiday: bool
+    is_early_close: bool
+    status: str
+
+# Only three possible answers - every lookup returns one of these shared instances
+_MARKET_CLOSED_INFO = HolidayInfo(True, False, "market_closed")
+_EARLY_CLOSE_INFO = HolidayInfo(False, True, "early_close")
+_NORMAL_TRADING_INFO = HolidayInfo(False, False, "normal_trading")
+
+# Holiday info for every special date, built once - any other date is normal trading
+_HOLIDAY_INFO_TABLE = {d: _EARLY_CLOSE_INFO for d in _EARLY_CLOSE}
+_HOLIDAY_INFO_TABLE.update((d, _MARKET_CLOSED_INFO) for d in _HOLIDAYS)
+
+# Status codes of holiday_status_array, indexing STATUS_INFO
+STATUS_NORMAL_TRADING = 0
+STATUS_EARLY_CLOSE = 1
+STATUS_MARKET_CLOSED = 2
+STATUS_INFO = (_NORMAL_TRADING_INFO, _EARLY_CLOSE_INFO, _MARKET_CLOSED_INFO)
+
+# Status code for every calendar day - a holiday wins over an early close on the same date
+_STATUS_BY_DAY = np.full(len(_CALENDAR_DAYS), STATUS_NORMAL_TRADING, dtype=np.int8)
+_STATUS_BY_DAY[_IS_EARLY_CLOSE] = STATUS_EARLY_CLOSE
+_STATUS_BY_DAY[_IS_HOLIDAY] = STATUS_MARKET_CLOSED
 
 class USMarketHolidays:
+    # Exact-type dispatch for date coercion - other datetime subclasses (pd.Timestamp) use their .date(),
+    # anything else goes through pd.to_datetime
+    _COERCERS = {
+        str: _str_to_date,
+        datetime: datetime.date,
+        date: lambda value: value
+    }
+    
     def __init__(self):
-        self.holidays_2019_2024 = {
-            2019: {
-                'new_year': date(2019, 1, 1),
-                'mlk': date(2019, 1, 21),
-                'presidents': date(2019, 2, 18),
-                'good_friday': date(2019, 4, 19),
-                'memorial': date(2019, 5, 27),
-                'independence': date(2019, 7, 4),
-                'labor': date(2019, 9, 2),
-                'thanksgiving': date(2019, 11, 28),
-                'christmas': date(2019, 12, 25)
-            },
-            2020: {
-                'new_year': date(2020, 1, 1),
-                'mlk': date(2020, 1, 20),
-                'presidents': date(2020, 2, 17),
-                'good_friday': date(2020, 4, 10),
-                'memorial': date(2020, 5, 25),
-                'independence': date(2020, 7, 3),
-                'labor': date(2020, 9, 7),
-                'thanksgiving': date(2020, 11, 26),
-                'christmas': date(2020, 12, 25)
-            },
-            2021: {
-                'new_year': date(2021, 1, 1),
-                'mlk': date(2021, 1, 18),
-                'presidents': date(2021, 2, 15),
-                'good_friday': date(2021, 4, 2),
-                'memorial': date(2021, 5, 31),
-                'independence': date(2021, 7, 5),
-                'labor': date(2021, 9, 6),
-                'thanksgiving': date(2021, 11, 25),
-                'christmas': date(2021, 12, 24)
-            },
-            2022: {
-                'new_year': None,
-                'mlk': date(2022, 1, 17),
-                'presidents': date(2022, 2, 21),
-                'good_friday': date(2022, 4, 15),
-                'memorial': date(2022, 5, 30),
-                'juneteenth': date(2022, 6, 20),
-                'independence': date(2022, 7, 4),
-                'labor': date(2022, 9, 5),
-                'thanksgiving': date(2022, 11, 24),
-                'christmas': date(2022, 12, 26)
-            },
-            2023: {
-                'new_year': date(2023, 1, 2),
-                'mlk': date(2023, 1, 16),
-                'presidents': date(2023, 2, 20),
-                'good_friday': date(2023, 4, 7),
-                'memorial': date(2023, 5, 29),
-                'juneteenth': date(2023, 6, 19),
-                'independence': date(2023, 7, 4),
-                'labor': date(2023, 9, 4),
-                'thanksgiving': date(2023, 11, 23),
-                'christmas': date(2023, 12, 25)
-            },
-            2024: {
-                'new_year': date(2024, 1, 1),
-                'mlk': date(2024, 1, 15),
-                'presidents': date(2024, 2, 19),
-                'good_friday': date(2024, 3, 29),
-                'memorial': date(2024, 5, 27),
-                'juneteenth': date(2024, 6, 19),
-                'independence': date(2024, 7, 4),
-                'labor': date(2024, 9, 2),
-                'thanksgiving': date(2024, 11, 28),
-                'christmas': date(2024, 12, 25)
-            }
-        }
-        
-        self.early_close_days = {
-            2019: [date(2019, 7, 3), date(2019, 11, 29), date(2019, 12, 24)],
-            2020: [date(2020, 11, 27), date(2020, 12, 24)],
-            2021: [date(2021, 11, 26)],
-            2022: [date(2022, 11, 25)],
-            2023: [date(2023, 7, 3), date(2023, 11, 24)],
-            2024: [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)]
-        }
+        # Tables are built once at import and shared by every instance - treat them as read-only
+        self.holidays_2019_2024 = HOLIDAYS_2019_2024
+        self.early_close_days = EARLY_CLOSE_DAYS
+        self.holiday_info_table = _HOLIDAY_INFO_TABLE
+        self.normal_trading_info = _NORMAL_TRADING_INFO
+    
+    @classmethod
+    def _to_date(cls, value):
+        """Coerce a date, datetime, Timestamp or date string to a date"""
+        coerce = cls._COERCERS.get(type(value))
+        if coerce is not None:
+            return coerce(value)
+        if isinstance(value, datetime):
+            return value.date()
+        return _pandas_to_date(value)
     
     def is_holiday(self, check_date):
         """Check if given date is a US stock market holiday"""
-        if isinstance(check_date, str):
-            check_date = pd.to_datetime(check_date).date()
-        elif isinstance(check_date, pd.Timestamp):
-            check_date = check_date.date()
-        elif isinstance(check_date, datetime):
-            check_date = check_date.date()
-            
-        year = check_date.year
-        if year not in self.holidays_2019_2024:
-            return False
-            
-        holidays = [h for h in self.holidays_2019_2024[year].values() if h]
-        return check_date in holidays
+        return self._to_date(check_date) in _HOLIDAYS
+    
+    # Type-specialized variants for callers that always pass one type - no coercion dispatch
+    def is_holiday_for_date(self, check_date):
+        """is_holiday for a datetime.date"""
+        return check_date in _HOLIDAYS
+    
+    def is_holiday_for_timestamp(self, check_time):
+        """is_holiday for a datetime or pd.Timestamp"""
+        return check_time.date() in _HOLIDAYS
+    
+    def is_holiday_for_str(self, check_date):
+        """is_holiday for a date string"""
+        return _str_to_date(check_date) in _HOLIDAYS
+    
+    def is_holiday_array(self, dates):
+        """Vectorized is_holiday - boolean mask for a DatetimeIndex or array-like of dates"""
+        return _calendar_flags(_IS_HOLIDAY, self._to_day_array(dates))
     
     def is_early_close(self, check_date):
         """Check if given date is an early close day (1:00 PM EST)"""
-        if isinstance(check_date, str):
-            check_date = pd.to_datetime(check_date).date()
-        elif isinstance(check_date, pd.Timestamp):
-            check_date = check_date.date()
-        elif isinstance(check_date, datetime):
-            check_date = check_date.date()
-            
-        year = check_date.year
-        if year not in self.early_close_days:
-            return False
-            
-        return check_date in self.early_close_days[year]
+        return self._to_date(check_date) in _EARLY_CLOSE
+    
+    def is_early_close_for_date(self, check_date):
+        """is_early_close for a datetime.date"""
+        return check_date in _EARLY_CLOSE
+    
+    def is_early_close_for_timestamp(self, check_time):
+        """is_early_close for a datetime or pd.Timestamp"""
+        return check_time.date() in _EARLY_CLOSE
+    
+    def is_early_close_for_str(self, check_date):
+        """is_early_close for a date string"""
+        return _str_to_date(check_date) in _EARLY_CLOSE
+    
+    def is_early_close_array(self, dates):
+        """Vectorized is_early_close - boolean mask for a DatetimeIndex or array-like of dates"""
+        return _calendar_flags(_IS_EARLY_CLOSE, self._to_day_array(dates))
+    
+    @staticmethod
+    def _to_day_array(dates):
+        """Calendar days as datetime64[D] - tz-aware input is taken at its local wall-clock date"""
+        import pandas as pd
+        index = pd.DatetimeIndex(dates)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return index.to_numpy().astype('datetime64[D]')
     
     def get_holiday_info(self, check_date):
-        """Get complete holiday information for a given date"""
-        is_holiday = self.is_holiday(check_date)
-        is_early_close = self.is_early_close(check_date)
-        
-        if is_holiday:
-            status = "market_closed"
-        elif is_early_close:
-            status = "early_close"
-        else:
-            status = "normal_trading"
-            
-        return {
-            'is_holiday': is_holiday,
-            'is_early_close': is_early_close,
-            'status': status
-        }
+        """Get complete holiday information for a given date as a HolidayInfo"""
+        return self.holiday_info_table.get(self._to_date(check_date), self.normal_trading_info)
+    
+    def holiday_status_array(self, dates):
+        """
+        Vectorized get_holiday_info - int8 status codes (STATUS_NORMAL_TRADING, STATUS_EARLY_CLOSE,
+        STATUS_MARKET_CLOSED) for a DatetimeIndex or array-like of dates; STATUS_INFO[code] is the HolidayInfo
+        """
+        return _calendar_flags(_STATUS_BY_DAY, self._to_day_array(dates))
     
     def get_next_trading_day(self, current_date):
         """Get the next trading day after the given date"""
-        if isinstance(current_date, str):
-            current_date = pd.to_datetime(current_date).date()
-        elif isinstance(current_date, pd.Timestamp):
-            current_date = current_date.date()
-        elif isinstance(current_date, datetime):
-            current_date = current_date.date()
-            
-        next_day = current_date + timedelta(days=1)
+        current_date = self._to_date(current_date)
+        
+        ordinal = current_date.toordinal()
         
-        while self.is_holiday(next_day) or next_day.weekday() >= 5:
-            next_day = next_day + timedelta(days=1)
+        # Inside the covered years the answer is precomputed
+        offset = ordinal - _CALENDAR_START_ORDINAL
+        if 0 <= offset < len(_NEXT_TRADING_OFFSET) and _NEXT_TRADING_OFFSET[offset] >= 0:
+            return date.fromordinal(_CALENDAR_START_ORDINAL + int(_NEXT_TRADING_OFFSET[offset]))
+            
+        # Walk day ordinals and build a date only for the answer - ordinal 1 is a Monday,
+        # so ordinal % 7 is 6 on Saturdays and 0 on Sundays
+        ordinal += 1
+        while ordinal % 7 in (0, 6) or ordinal in _HOLIDAY_ORDINALS:
+            ordinal += 1
             
-        return next_day
\ No newline at end of file
+        return date.fromordinal(ordinal)
+    
+    def get_next_trading_day_batch(self, dates):
+        """Vectorized get_next_trading_day - datetime64[D] next trading days for a DatetimeIndex or array-like of dates"""
+        return _next_trading_days(self._to_day_array(dates))
+
+# Shared instance - import this rather than constructing per caller
+HOLIDAYS = USMarketHolidays()
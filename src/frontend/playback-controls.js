@@ -327,6 +327,21 @@ class PlaybackControls {
                 }
                 break;
                 
+            case 'resync':
+                // Server dropped candles after this client stalled - continue from the new position
+                console.warn(`⏭️ Replay resync: skipped ${data.skipped} candles`);
+                this.currentIndex = data.index;
+                
+                if (this.onStatusChanged) {
+                    this.onStatusChanged({
+                        type: 'progress',
+                        currentIndex: this.currentIndex,
+                        totalCandles: this.totalCandles,
+                        progress: data.progress || 0
+                    });
+                }
+                break;
+                
             case 'finished':
                 console.log('🏁 Multi-timeframe replay finished');
                 this.isPlaying = false;
@@ -7,12 +7,23 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = DATA_DIR / "cache"  # Arrow IPC copies of parsed CSVs, shared by all server processes
 
 FLASK_CONFIG = {
     "HOST": "127.0.0.1",
     "PORT": 5001,
-    "DEBUG": True,
-    "THREADED": True
+    "MAX_CONNECTIONS": 1000,  # Concurrent greenlets per server process (SSE clients included)
+    "WORKERS": 1  # Each worker process loads its own copy of the data
+}
+
+# Flask-Compress settings - applied to app.config
+COMPRESS_CONFIG = {
+    "COMPRESS_ALGORITHM": ["br", "gzip"],
+    "COMPRESS_BR_LEVEL": 4,
+    "COMPRESS_LEVEL": 4,
+    "COMPRESS_MIN_SIZE": 1024,
+    "COMPRESS_MIMETYPES": ["application/json", "application/javascript", "text/javascript", "text/css", "text/html"],
+    "COMPRESS_STREAMS": False  # Never buffer the SSE replay stream
 }
 
 TIMEFRAMES = ["M1", "M5", "M15", "H1", "H4", "D1"]
@@ -35,6 +46,12 @@ FVG_CONFIG = {
     "bearish_color": "rgba(255, 0, 0, 0.2)"
 }
 
+REPLAY_CONFIG = {
+    "batch_interval": 0.05,  # Below this many seconds per candle, send several candles per SSE write
+    "max_batch": 100,  # Upper bound on candles per write (speed 0 = as fast as possible)
+    "max_lag": 5.0  # A write blocked longer than this many seconds drops the candles due meanwhile
+}
+
 MARKET_HOURS = {
     "open": "09:30",
     "close": "16:00",
@@ -45,5 +62,7 @@ LOADING_CONFIG = {
     "batch_size": 10000,
     "max_file_rows": 200000,
     "use_vectorization": True,
-    "enable_caching": True
+    "enable_caching": True,
+    "max_workers": 6,
+    "shared_cache": True
 }
\ No newline at end of file